@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+
+from visualizations.cache import LIBRARIES  # noqa: E402
+from visualizations.network import NeuralNetworkAnimation  # noqa: E402
+from visualizations.wave import WaveAnimation  # noqa: E402
+from visualizations.writers import open_writer  # noqa: E402
+
+# Parameter grids, every combination is one benchmark case
+GRIDS = {
+    "quick": {
+        "wave": {"steps": [2000], "dpi": [50], "figsize": [(20, 4)]},
+        "network": {"size": [(12, 5)], "dpi": [50]},
+    },
+    "full": {
+        "wave": {"steps": [2000, 20000], "dpi": [50, 100], "figsize": [(20, 4), (10, 2)]},
+        "network": {"size": [(12, 5), (24, 9)], "dpi": [50, 100]},
+    },
+}
+
+# Frames timed per case, taken from the middle of the animation
+SAMPLE_FRAMES = 20
+
+# Metrics ending in this suffix are throughputs, all others are costs
+THROUGHPUT_SUFFIX = "_per_s"
+
+
+def best_of(function, repeat=3):
+    """Smallest wall time of repeated calls, the least disturbed measurement"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def time_frames(frames):
+    """Mean wall time per frame of a frame iterator, frames are copied for encoding"""
+    collected = []
+    start = time.perf_counter()
+
+    for frame in frames:
+        collected.append(np.array(frame[..., :3]))
+
+    return (time.perf_counter() - start) / max(len(collected), 1), collected
+
+
+def time_encoders(frames, fps, metrics):
+    """Mean wall time per frame of every writer, writers that are unavailable are skipped"""
+    with tempfile.TemporaryDirectory() as directory:
+        for suffix in ("mp4", "gif"):
+            try:
+                start = time.perf_counter()
+                with open_writer(Path(directory) / f"benchmark.{suffix}", fps) as writer:
+                    for frame in frames:
+                        writer.write(frame)
+                metrics[f"encode_{suffix}_s"] = (time.perf_counter() - start) / len(frames)
+            except FileNotFoundError as e:
+                print(f"Skipping {suffix} encoder: {e}")
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def bench_wave(steps, dpi, figsize):
+    metrics = {}
+    start = time.perf_counter()
+    wave_animation = WaveAnimation(steps, dpi=dpi, figsize=figsize)
+    metrics["setup_s"] = time.perf_counter() - start
+
+    metrics["generate_s"] = best_of(lambda: wave_animation.make_segments(
+        wave_animation.time, wave_animation.generate_wave()[0]))
+
+    angles = np.random.default_rng(0).uniform(-np.pi, np.pi, 1_000_000)
+    metrics["angle_2_color_per_s"] = len(angles) / best_of(
+        lambda: wave_animation.angle_2_color(angles))
+
+    first = max(len(wave_animation.frames) // 2 - SAMPLE_FRAMES // 2, 0)
+    stop = first + SAMPLE_FRAMES
+    frames = None
+
+    for backend in WaveAnimation.backends:
+        if backend != "matplotlib":
+            wave_animation = WaveAnimation(steps, backend=backend, dpi=dpi, figsize=figsize)
+
+        # Persistent-canvas backends draw everything revealed so far into their
+        # first frame, that one-off catch-up is timed apart from the frames
+        iterator = wave_animation.iter_frames(max(first - 1, 0), stop)
+        start = time.perf_counter()
+        next(iterator)
+        metrics[f"catch_up_{backend}_s"] = time.perf_counter() - start
+        metrics[f"frame_{backend}_s"], frames = time_frames(iterator)
+
+    time_encoders(frames, wave_animation.fps, metrics)
+    metrics["peak_rss_mb"] = peak_rss_mb()
+
+    return metrics
+
+
+def bench_network(size, dpi):
+    metrics = {}
+    start = time.perf_counter()
+    nn_animation = NeuralNetworkAnimation(*size, 100, dpi=dpi)
+    metrics["setup_s"] = time.perf_counter() - start
+
+    # animate only updates the artists, the canvas draw rasterizes them
+    first = nn_animation.total_frames // 2 - SAMPLE_FRAMES // 2
+    animate, draw = [], []
+
+    for frame in range(first, first + SAMPLE_FRAMES):
+        start = time.perf_counter()
+        nn_animation.animate(frame)
+        animate.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        nn_animation.fig.canvas.draw()
+        draw.append(time.perf_counter() - start)
+
+    metrics["animate_s"] = float(np.mean(animate))
+    metrics["draw_s"] = float(np.mean(draw))
+    metrics["frame_s"], frames = time_frames(nn_animation.iter_frames(first, first + SAMPLE_FRAMES))
+
+    time_encoders(frames, nn_animation.fps, metrics)
+    metrics["peak_rss_mb"] = peak_rss_mb()
+
+    return metrics
+
+
+def cases(grid):
+    """Yield (name, benchmark function, arguments) for every point of the grid"""
+    wave = GRIDS[grid]["wave"]
+    for steps in wave["steps"]:
+        for dpi in wave["dpi"]:
+            for figsize in wave["figsize"]:
+                yield (f"wave steps={steps} dpi={dpi} figsize={figsize[0]}x{figsize[1]}",
+                       bench_wave, (steps, dpi, figsize))
+
+    network = GRIDS[grid]["network"]
+    for size in network["size"]:
+        for dpi in network["dpi"]:
+            yield (f"network size={size[0]}x{size[1]} dpi={dpi}",
+                   bench_network, (size, dpi))
+
+
+def machine_metadata():
+    versions = {}
+    for library in LIBRARIES:
+        try:
+            versions[library] = metadata.version(library)
+        except metadata.PackageNotFoundError:
+            versions[library] = None
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "libraries": versions,
+        "commit": commit,
+    }
+
+
+def run_suite(grid):
+    results = {}
+
+    for name, function, arguments in cases(grid):
+        print(f"Running {name}...")
+
+        # A fresh process per case, so peak RSS and caches do not leak between cases
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results[name] = pool.submit(function, *arguments).result()
+
+    return {"metadata": machine_metadata(), "grid": grid, "results": results}
+
+
+def compare(current, baseline, threshold):
+    """Print relative changes against the baseline and return the regressions"""
+    regressions = []
+
+    for name, metrics in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+
+        print(f"\n{name}")
+        for metric, value in metrics.items():
+            if reference.get(metric) is None:
+                continue
+
+            if reference[metric] == 0:
+                change = 0.0 if value == 0 else float("inf")
+            else:
+                change = value / reference[metric] - 1
+            # Throughputs regress when they drop, costs when they grow
+            worse = -change if metric.endswith(THROUGHPUT_SUFFIX) else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            print(f"  {metric:<22} {reference[metric]:>12.5g} -> {value:>12.5g} "
+                  f"({change:+.1%}){flag}")
+
+            if flag:
+                regressions.append((name, metric, change))
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the wave and network animations.")
+    parser.add_argument("-g", "--grid", type=str, default="quick", choices=GRIDS,
+                        help="Parameter grid to run")
+    parser.add_argument("-o", "--output", type=str, default="benchmark_results.json",
+                        help="File the results are written to")
+    parser.add_argument("-b", "--baseline", type=str,
+                        help="Results of an earlier run to compare against")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1,
+                        help="Relative slowdown flagged as a regression (default: 0.1)")
+
+    args = parser.parse_args()
+
+    current = run_suite(args.grid)
+
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"Results written to '{args.output}'")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        if baseline["metadata"]["platform"] != current["metadata"]["platform"]:
+            print("Warning: the baseline was recorded on a different platform")
+
+        regressions = compare(current, baseline, args.threshold)
+        print(f"\n{len(regressions)} regressions beyond {args.threshold:.0%}")
+
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,70 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+
+from visualizations.wave import WaveAnimation  # noqa: E402
+
+
+def final_frame_matplotlib(wave_animation):
+    """Render the fully revealed wave through Agg"""
+    for line_collection in wave_animation.ax.collections:
+        line_collection.set_alpha(np.ones(len(line_collection.get_segments())))
+    wave_animation.fig.canvas.draw()
+    return np.asarray(wave_animation.fig.canvas.buffer_rgba())[..., :3].copy()
+
+
+def final_frame_persistent(wave_animation):
+    """Render the fully revealed wave through a persistent-canvas backend"""
+    frame = None
+    for frame in wave_animation.iter_frames():
+        pass
+    return frame[..., :3].copy()
+
+
+def time_backend(backend, steps, dpi, directory):
+    start = time.perf_counter()
+    wave_animation = WaveAnimation(steps, backend=backend, dpi=dpi)
+    setup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    wave_animation.save_as(Path(directory) / f"{backend}.mp4")
+    render = time.perf_counter() - start
+
+    return wave_animation, setup, render
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the wave render backends.")
+    parser.add_argument("-n", "--numberSteps", type=int, default=500,
+                        help="Number of steps in wave animation")
+    parser.add_argument("-d", "--dpi", type=int, default=100, help="Figure resolution")
+
+    args = parser.parse_args()
+
+    frames = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in WaveAnimation.backends:
+            wave_animation, setup, render = time_backend(
+                backend, args.numberSteps, args.dpi, directory)
+            n_frames = len(wave_animation.frames)
+            print(f"{backend:>11}: setup {setup:.2f}s, render {render:.2f}s "
+                  f"({n_frames / render:.1f} frames/s)")
+
+            if backend == "matplotlib":
+                frames[backend] = final_frame_matplotlib(wave_animation)
+            else:
+                frames[backend] = final_frame_persistent(wave_animation)
+
+    for backend, frame in frames.items():
+        if backend == "matplotlib":
+            continue
+
+        diff = np.abs(frames["matplotlib"].astype(int) - frame.astype(int))
+        print(f"Final frame difference to matplotlib ({backend}): mean {diff.mean():.3f}, "
+              f"99th percentile {np.percentile(diff, 99):.0f}, max {diff.max()} (0-255)")
@@ -1,42 +1,479 @@
 import argparse
-from visualizations.network import NeuralNetworkAnimation
-from visualizations.wave import WaveAnimation
+import json
+import time
+from pathlib import Path
 
+from visualizations.cache import RenderCache
+from visualizations.metrics import RenderMetrics
+from visualizations.options import (PHASE_PALETTES, WAVE_BACKENDS, parse_frames, parse_layers,
+                                    parse_output_spec, positive_float, positive_int)
+from visualizations.registry import Registry, Visualization
 
-def create_network(w: int, h: int, steps: int, fn: str):
-    print("This will create a GIF file with an animated network structure.")
+# Figure size in inches, the pixel count of a job is this times dpi squared
+WAVE_FIGSIZE = (20, 4)
+
+# Arguments that do not change the rendered file
+CACHE_IGNORED_ARGS = {"path", "workers", "chunkSize", "frameCacheMb", "cache", "cacheDir", "cacheMaxMb",
+                      "files", "report", "metrics", "profile", "alertSeconds", "queueDepth", "layersFile"}
+
+# Shards of one render share all other arguments
+SHARD_IGNORED_ARGS = CACHE_IGNORED_ARGS | {"frames", "output", "preview", "index"}
+
+
+def create_network(w: int, h: int, steps: int, fn: str, workers: int = 1, dpi: float = None,
+                   loops: int = 1, frame_cache_mb: float = 1024, metrics: RenderMetrics = None,
+                   queue_depth: int = 4, layers: list = None, max_edges: int = None,
+                   preview: bool = False, outputs: list = None, frames: tuple = (0, None)):
+    if not preview:
+        print("This will create a GIF file with an animated network structure.")
 
     if w > 0 and h > 0:
-        nn_animation = NeuralNetworkAnimation(w, h, steps)
+        from visualizations.network import NeuralNetworkAnimation
+
+        metrics = metrics if metrics is not None else RenderMetrics()
+        with metrics.phase("setup"):
+            topology = {"layers": layers} if layers else {}
+            nn_animation = NeuralNetworkAnimation(w, h, steps, dpi=dpi, frame_cache_mb=frame_cache_mb,
+                                                  metrics=metrics, max_edges=max_edges, **topology)
 
-        filename = fn if fn != "" else "neural_network_animation.gif"
-        anim = nn_animation.save_as_gif(filename)
+        if preview:
+            nn_animation.preview()
+        elif not check_frames(frames, nn_animation.total_frames * loops):
+            return None
+        elif outputs:
+            nn_animation.save(outputs, workers, loops, queue_depth, *frames)
+        else:
+            filename = fn if fn != "" else "neural_network_animation.gif"
+            nn_animation.save_as_gif(filename, workers, loops, queue_depth)
 
-        return anim
+        return nn_animation
     else:
         print(f"Expected w, h > 0, received: {w}, {h}")
 
 
-def create_wave(steps: int, start: int, end: int, fn: str):
-    print("This will create a MP4 file with an animated wave.")
+def create_wave(steps: int, start: int, end: int, fn: str, backend: str = "matplotlib",
+                duration: float = None, fps: float = None, workers: int = 1,
+                dpi: float = 300, seed: int = 322, chunk_size: int = 65536,
+                lod: bool = False, lod_report: bool = False, palette: str = "hls",
+                color_resolution: int = 256, metrics: RenderMetrics = None,
+                queue_depth: int = 4, preview: bool = False, outputs: list = None,
+                frames: tuple = (0, None)):
+    if not preview:
+        print("This will create a MP4 file with an animated wave.")
 
     if end > start:
-        wave_animation = WaveAnimation(steps, start, end)
+        from visualizations.wave import WaveAnimation
 
-        filename = fn if fn != "" else "wave_animation.mp4"
-        anim = wave_animation.save_as(filename)
+        metrics = metrics if metrics is not None else RenderMetrics()
+        # The preview draws the revealed segments itself, no FuncAnimation is set up for it
+        if preview and backend == "matplotlib":
+            backend = "incremental"
 
-        return anim
+        with metrics.phase("setup"):
+            wave_animation = WaveAnimation(steps, start, end, backend=backend, dpi=dpi,
+                                           duration=duration, fps=fps, seed=seed,
+                                           chunk_size=chunk_size, lod=lod or lod_report,
+                                           palette=palette, color_resolution=color_resolution,
+                                           metrics=metrics)
+
+        if lod_report:
+            report = wave_animation.lod_report()
+            print(f"Level of detail: {report['drawn']} of {report['segments']} segments drawn, "
+                  f"mean pixel error {report['mean_error']:.3f}, max {report['max_error']}, "
+                  f"{report['visible_pixels']:.3%} of pixels visibly different")
+
+        if preview:
+            wave_animation.preview()
+        elif not check_frames(frames, len(wave_animation.frames)):
+            return None
+        elif outputs:
+            wave_animation.save(outputs, workers, queue_depth, *frames)
+        else:
+            filename = fn if fn != "" else "wave_animation.mp4"
+            wave_animation.save_as(filename, workers, queue_depth)
+
+        return wave_animation
     else:
         print(f"Expected start < end, received: start({start}), end({end})")
 
 
+def render_cached(cache: RenderCache, args: argparse.Namespace, path: str, render):
+    """Serve path from the render cache, or render it and add it to the cache"""
+    parameters = {name: value for name, value in vars(args).items()
+                  if name not in CACHE_IGNORED_ARGS}
+    parameters["writer"] = Path(path).suffix.lower()
+    key = cache.key(parameters)
+
+    start = time.perf_counter()
+    if cache.fetch(key, path):
+        print(f"Served '{path}' from the render cache in {time.perf_counter() - start:.3f}s")
+        return True
+
+    render_start = time.time()
+    render()
+
+    # Only cache files written by this render, not leftovers of earlier runs
+    if Path(path).exists() and Path(path).stat().st_mtime >= render_start:
+        cache.store(key, path)
+        return True
+
+    return False
+
+
+def parse_outputs(args: argparse.Namespace, path: str):
+    """Output files of --output, None renders all frames to path the default way"""
+    if not args.output and not args.frames:
+        return None
+
+    from visualizations.writers import Output
+
+    return [Output.parse(spec) for spec in output_paths(args, path, options=True)]
+
+
+def frame_slice(args: argparse.Namespace):
+    if not args.frames:
+        return (0, None)
+
+    return parse_frames(args.frames)
+
+
+def check_frames(frames: tuple, total: int):
+    """Check a --frames slice against the frame count, a slice past the end is cut off"""
+    start, stop = frames
+    if (start, stop) == (0, None):
+        # All frames, --frames was not given
+        return True
+
+    if start >= total:
+        print(f"Expected --frames to start before frame {total}, received: {start}")
+        return False
+
+    if stop is not None and stop > total:
+        print(f"⚠️  The animation has {total} frames, rendering frames {start}:{total}")
+
+    return True
+
+
+def render_dpi(args: argparse.Namespace, outputs: list, figsize: tuple, default: float):
+    """--dpi, else the lowest resolution that renders every output at its size or larger"""
+    if args.dpi:
+        return args.dpi
+
+    return max((max((output.width or 0) / figsize[0], (output.height or 0) / figsize[1]) or default
+                for output in outputs or []), default=default)
+
+
+def render_wave(args: argparse.Namespace, path: str, metrics: RenderMetrics = None):
+    outputs = parse_outputs(args, path)
+    # The preview window uses the screen resolution
+    dpi = render_dpi(args, outputs, WAVE_FIGSIZE, 100 if args.preview else 300)
+
+    return create_wave(args.numberSteps, args.startTime, args.endTime, path, args.backend,
+                       args.duration, args.fps, args.workers, dpi, args.seed, args.chunkSize,
+                       args.lod, args.lodReport, args.palette, args.colorResolution, metrics,
+                       args.queueDepth, args.preview, outputs, frame_slice(args))
+
+
+def render_network(args: argparse.Namespace, path: str, metrics: RenderMetrics = None):
+    outputs = parse_outputs(args, path)
+    dpi = render_dpi(args, outputs, (args.xWidth, args.yHeight), 100) if args.output else args.dpi
+
+    return create_network(args.xWidth, args.yHeight, args.numberSteps, path, args.workers,
+                          dpi, args.loops, args.frameCacheMb, metrics, args.queueDepth,
+                          args.layers, args.maxEdges, args.preview, outputs, frame_slice(args))
+
+
+def wave_cost(args: argparse.Namespace):
+    """Rough render cost of a job: animation steps times output pixels"""
+    dpi = args.dpi if args.dpi else 300
+    return args.numberSteps * WAVE_FIGSIZE[0] * WAVE_FIGSIZE[1] * dpi ** 2
+
+
+def network_cost(args: argparse.Namespace):
+    # The network renders a fixed number of frames per cycle at matplotlib's default dpi
+    dpi = args.dpi if args.dpi else 100
+    return 120 * args.loops * args.xWidth * args.yHeight * dpi ** 2
+
+
+def network_frames(args: argparse.Namespace, animation):
+    return animation.total_frames * args.loops
+
+
+# Built-in visualizations, their modules are imported by create_wave/create_network
+REGISTRY = Registry()
+REGISTRY.register(Visualization("wave", render_wave, "wave_animation.mp4",
+                                "Phase-colored wave (MP4)", estimate_cost=wave_cost,
+                                modules=("visualizations.wave", "seaborn")))
+REGISTRY.register(Visualization("network", render_network, "network_animation.gif",
+                                "Neural network structure (GIF)", estimate_cost=network_cost,
+                                count_frames=network_frames, modules=("visualizations.network",)))
+
+
+def output_paths(args: argparse.Namespace, path: str, options: bool = False):
+    """Files written by a render: the paths of --output, else path, with options if requested"""
+    if not args.output:
+        return [path]
+
+    return [spec if options else spec.split(":")[0] for spec in args.output]
+
+
+def write_shard_manifests(args: argparse.Namespace, visualization: Visualization, animation,
+                          path: str):
+    """Describe every file of a --frames render, so that stitch can check and order the shards"""
+    from visualizations.shards import write_manifest
+
+    total = visualization.count_frames(args, animation)
+    start, stop = frame_slice(args)
+    stop = total if stop is None else min(stop, total)
+    parameters = {name: value for name, value in vars(args).items()
+                  if name not in SHARD_IGNORED_ARGS}
+
+    for output in parse_outputs(args, path):
+        # Image sequences are numbered by frame and vector outputs hold the whole
+        # animation, there is nothing to stitch
+        if output.is_sequence() or output.is_vector():
+            continue
+
+        write_manifest(output.path, visualization=args.visualization, frames=[start, stop],
+                       total_frames=total, fps=animation.fps / output.stride, stride=output.stride,
+                       size=[output.width, output.height], parameters=parameters)
+
+
+def build_render(args: argparse.Namespace, metrics: RenderMetrics = None):
+    """Return the output path and a function rendering the selected visualization"""
+    visualization = REGISTRY.get(args.visualization)
+
+    if visualization is None:
+        return None, None
+
+    p = args.path if args.path else visualization.default_path
+    if args.output:
+        p = ", ".join(output_paths(args, p))
+
+    def render():
+        animation = visualization.render(args, p, metrics)
+        if animation is not None and args.frames:
+            write_shard_manifests(args, visualization, animation, p)
+
+        return animation
+
+    return p, render
+
+
+def read_layers(path: str):
+    """Layer sizes from a JSON file, either a list or an object with a "layers" list"""
+    with open(path) as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in '{path}': {e}") from None
+
+    if isinstance(config, dict):
+        if "layers" not in config:
+            raise ValueError(f"Expected a \"layers\" list in '{path}'")
+        config = config["layers"]
+
+    return parse_layers(config)
+
+
+def load_manifest(path: str, parser: argparse.ArgumentParser, defaults: dict = None):
+    """Read batch jobs, each job uses the long option names of the CLI as keys
+
+    `defaults` override the CLI defaults for options a job does not set.
+    Returns (jobs, rejected), jobs are complete argument namespaces and rejected
+    jobs are reports of entries that could not be parsed.
+    """
+    with open(path) as f:
+        manifest = json.load(f)
+
+    entries = manifest["jobs"] if isinstance(manifest, dict) else manifest
+    jobs, rejected = [], []
+
+    for index, entry in enumerate(entries):
+        visualization = entry.get("visualization")
+        if REGISTRY.get(visualization) is None:
+            rejected.append(failed_report(index, entry.get("path"),
+                                          f"unknown visualization '{visualization}'"))
+            continue
+
+        args = parser.parse_args([visualization])
+        unknown = set(entry) - set(vars(args))
+        if unknown:
+            rejected.append(failed_report(index, entry.get("path"),
+                                          f"unknown parameters {sorted(unknown)}"))
+            continue
+
+        vars(args).update(defaults or {})
+        vars(args).update(entry)
+        args.index = index
+
+        try:
+            if args.layersFile:
+                args.layers = read_layers(args.layersFile)
+            elif args.layers is not None:
+                args.layers = parse_layers(args.layers)
+        except (OSError, ValueError) as e:
+            rejected.append(failed_report(index, entry.get("path"), f"invalid layers: {e}"))
+            continue
+
+        jobs.append(args)
+
+    return jobs, rejected
+
+
+def failed_report(index: int, path: str, error: str):
+    return {"job": index, "path": path, "status": "failed", "error": error,
+            "wall_time": 0.0, "frames": 0, "fps": 0.0, "size": 0}
+
+
+# Queue the batch workers report the index of every started job to, set by warm_worker
+started_jobs = None
+
+
+def warm_worker(names, started=None):
+    """Pay the imports of the batch's visualizations and the font lookup once per pool process"""
+    global started_jobs
+    started_jobs = started
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    for name in names:
+        REGISTRY.get(name).preload()
+
+    from matplotlib import font_manager
+    font_manager.findfont(font_manager.FontProperties())
+
+
+def render_job(args: argparse.Namespace):
+    """Render one batch job, failures are reported instead of raised"""
+    if started_jobs is not None:
+        started_jobs.put(args.index)
+
+    metrics = RenderMetrics(progress=False, alert_seconds=args.alertSeconds)
+    p, render = build_render(args, metrics)
+    start = time.perf_counter()
+
+    try:
+        animation = render()
+        if animation is None:
+            raise ValueError("invalid parameters, nothing was rendered")
+    except Exception as e:
+        return failed_report(args.index, p, f"{type(e).__name__}: {e}")
+
+    wall_time = time.perf_counter() - start
+    frames = REGISTRY.get(args.visualization).count_frames(args, animation)
+
+    return {"job": args.index, "path": p, "status": "ok", "error": None,
+            "wall_time": wall_time, "frames": frames, "fps": frames / wall_time,
+            "size": sum(Path(path).stat().st_size for path in output_paths(args, p)
+                        if Path(path).is_file()),
+            "slow": metrics.slow(),
+            "phases": metrics.to_dict()["phases"]}
+
+
+def run_batch(jobs, workers: int):
+    """Render jobs on a persistent process pool, most expensive jobs first
+
+    A worker process that dies, e.g. killed for running out of memory, breaks
+    the whole pool. Jobs that had not started are resubmitted to a fresh pool
+    and the jobs that were running are retried one at a time, so only the job
+    that kills its worker is reported as failed.
+    """
+    reports = []
+    jobs = sorted(jobs, key=lambda job: REGISTRY.get(job.visualization).estimate_cost(job),
+                  reverse=True)
+
+    names = sorted({job.visualization for job in jobs})
+
+    while jobs:
+        running, jobs = run_pool(jobs, workers, names, reports)
+
+        if not running:
+            # The pool broke before any job started, e.g. in warm_worker
+            for job in jobs:
+                report_job(job, failed_report(job.index, build_render(job)[0],
+                                              "the worker processes could not be started"), reports)
+            break
+
+        for job in running:
+            if len(running) == 1 or any(run_pool([job], 1, names, reports)):
+                report_job(job, failed_report(job.index, build_render(job)[0],
+                                              "the worker process died"), reports)
+
+    return sorted(reports, key=lambda report: report["job"])
+
+
+def run_pool(jobs, workers: int, names: list, reports: list):
+    """Render jobs on one process pool and add their reports
+
+    Returns the jobs that were running and the jobs that were still waiting
+    when a worker process died, both empty if every job finished.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+    from multiprocessing import SimpleQueue
+
+    # SimpleQueue writes synchronously, a started job is known even if its worker dies right away
+    started = SimpleQueue()
+    broken = set()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_worker,
+                             initargs=(names, started)) as pool:
+        futures = {pool.submit(render_job, job): job for job in jobs}
+
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                report = future.result()
+            except BrokenProcessPool:
+                broken.add(future)
+                continue
+            except Exception as e:
+                report = failed_report(job.index, build_render(job)[0], f"{type(e).__name__}: {e}")
+
+            report_job(job, report, reports)
+
+    indices = set()
+    while not started.empty():
+        indices.add(started.get())
+
+    # Unfinished jobs keep their submission order, the most expensive first
+    unfinished = [job for future, job in futures.items() if future in broken]
+    return ([job for job in unfinished if job.index in indices],
+            [job for job in unfinished if job.index not in indices])
+
+
+def report_job(job: argparse.Namespace, report: dict, reports: list):
+    status = "done" if report["status"] == "ok" else f"failed ({report['error']})"
+    if report.get("slow"):
+        status += f", slower than {job.alertSeconds}s"
+    print(f"Job {report['job']} '{report['path']}' {status}")
+    reports.append(report)
+
+
+def print_batch_report(reports):
+    print(f"\n{'job':>4}  {'status':<6}  {'time':>8}  {'frames/s':>8}  {'size':>10}  path")
+    for report in reports:
+        print(f"{report['job']:>4}  {report['status']:<6}  {report['wall_time']:>7.2f}s  "
+              f"{report['fps']:>8.1f}  {report['size'] / 1024 ** 2:>8.2f}MB  {report['path']}")
+
+    failed = sum(report["status"] != "ok" for report in reports)
+    print(f"{len(reports) - failed} of {len(reports)} jobs succeeded")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generator for animated visualizations.")
 
     parser.add_argument("visualization", type=str, default="wave",
-                        help="Visualization to generate. Should be one of: [\"wave\", \"network\"]")
+                        help="Visualization to generate: \"wave\", \"network\", an installed plugin, "
+                             "\"batch\" to render a manifest or \"stitch\" to join shards")
+    parser.add_argument("files", type=str, nargs="*",
+                        help="JSON job manifest rendered by the batch mode, or the shards joined by stitch")
     parser.add_argument("-p", "--path", type=str, help="Output file path")
+    parser.add_argument("-o", "--output", type=str, action="append",
+                        help="Output of a single render pass, repeatable: "
+                             "path[:width=W][:height=H][:stride=N], e.g. thumb.gif:width=480:stride=2")
     parser.add_argument("-x", "--xWidth", type=int, default=24, help="Width of network animation")
     parser.add_argument("-y", "--yHeight", type=int, default=9, help="Height of network animation")
     parser.add_argument("-n", "--numberSteps", type=int, default=5000,
@@ -45,24 +482,163 @@ if __name__ == "__main__":
                         help="Start time for the wave animation")
     parser.add_argument("-e", "--endTime", type=int, default=5,
                         help="End time for the wave animation")
+    parser.add_argument("-b", "--backend", type=str, default="matplotlib",
+                        choices=WAVE_BACKENDS,
+                        help="Render backend for the wave animation")
+    parser.add_argument("-d", "--duration", type=positive_float,
+                        help="Target video length of the wave animation in seconds")
+    parser.add_argument("-f", "--fps", type=positive_float,
+                        help="Frame rate of the wave animation (default: 33.3)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Number of processes rendering frame chunks in parallel")
+    parser.add_argument("--dpi", type=float,
+                        help="Figure resolution (default: 300 for wave, 100 for network)")
+    parser.add_argument("--seed", type=int, default=322,
+                        help="Seed of the random frequency curve of the wave animation")
+    parser.add_argument("--chunkSize", type=positive_int, default=65536,
+                        help="Samples per chunk when streaming the wave (incremental/numpy backends)")
+    parser.add_argument("--lod", action="store_true",
+                        help="Merge wave segments within one pixel column and color into one stroke")
+    parser.add_argument("--lodReport", action="store_true",
+                        help="Report drawn segments and pixel error of the level of detail stage")
+    parser.add_argument("--palette", type=str, default="hls", choices=PHASE_PALETTES,
+                        help="Cyclic color palette of the wave phase")
+    parser.add_argument("--colorResolution", type=positive_int, default=256,
+                        help="Number of entries of the quantized phase color table")
+    parser.add_argument("--layers", type=int, nargs="+",
+                        help="Nodes per layer of the network animation (default: 3 5 6 5 6 5 3)")
+    parser.add_argument("--layersFile", type=str,
+                        help="JSON file with the nodes per layer of the network animation")
+    parser.add_argument("--maxEdges", type=positive_int,
+                        help="Strokes drawn per layer pair of the network animation, denser pairs "
+                             "are bundled (default: every edge)")
+    parser.add_argument("--loops", type=positive_int, default=1,
+                        help="Number of animation cycles written by the network animation")
+    parser.add_argument("--frameCacheMb", type=float, default=1024,
+                        help="Memory cap in MB for the rendered frames of one network cycle")
+    parser.add_argument("--queueDepth", type=int, default=4,
+                        help="Frames buffered between rendering and the encoder thread, 0 encodes in series")
+    parser.add_argument("--frames", type=str,
+                        help="Only render frames START:END into a shard, joined later by stitch")
+    parser.add_argument("--preview", action="store_true",
+                        help="Play the animation in a window instead of rendering it to a file")
+    parser.add_argument("--cache", action="store_true",
+                        help="Serve identical renders from the on-disk render cache")
+    parser.add_argument("--cacheDir", type=str, default=".render_cache",
+                        help="Directory of the render cache")
+    parser.add_argument("--cacheMaxMb", type=float, default=2048,
+                        help="Size limit of the render cache in MB, least recently used files are evicted")
+    parser.add_argument("--metrics", type=str,
+                        help="Write render phase timings and frame rate to this JSON file")
+    parser.add_argument("--profile", type=str,
+                        help="Write a cProfile dump of the render to this file")
+    parser.add_argument("--alertSeconds", type=float,
+                        help="Warn when a render takes (or is expected to take) longer than this")
+    parser.add_argument("--report", type=str,
+                        help="Write the per-job report of the batch mode to this JSON file")
 
     args = parser.parse_args()
 
+    if args.visualization == "batch":
+        if len(args.files) != 1:
+            parser.error("batch requires a manifest file")
+
+        jobs, rejected = load_manifest(args.files[0], parser, {"alertSeconds": args.alertSeconds})
+        print(f"Rendering {len(jobs)} jobs with {args.workers} worker processes...")
+
+        reports = sorted(rejected + run_batch(jobs, args.workers), key=lambda report: report["job"])
+        print_batch_report(reports)
+
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(reports, f, indent=2)
+
+        raise SystemExit(0 if all(report["status"] == "ok" for report in reports) else 1)
+
+    if args.visualization == "stitch":
+        if not args.files or not args.path:
+            parser.error("stitch requires shard files and the --path of the joined file")
+
+        from visualizations.shards import stitch
+
+        try:
+            (start, stop), total = stitch(args.files, args.path)
+        except (OSError, ValueError) as e:
+            print(f"Could not stitch the shards: {e}")
+            raise SystemExit(1)
+
+        if (start, stop) != (0, total):
+            print(f"⚠️  The shards only cover frames {start}:{stop} of {total}")
+
+        print(f"\n✅ Success! {len(args.files)} shards have been joined as '{args.path}'")
+        raise SystemExit(0)
+
+    try:
+        if args.layersFile:
+            args.layers = read_layers(args.layersFile)
+        elif args.layers is not None:
+            args.layers = parse_layers(args.layers)
+    except OSError as e:
+        parser.error(f"Could not read the layers file: {e}")
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        for spec in args.output or []:
+            parse_output_spec(spec)
+        if args.frames:
+            parse_frames(args.frames)
+    except ValueError as e:
+        parser.error(str(e))
+
     print("Creating Animation...")
 
     # TODO: input validation
 
     withSuccess = False
 
-    if args.visualization == "wave":
-        p = args.path if args.path else "wave_animation.mp4"
-        create_wave(args.numberSteps, args.startTime, args.endTime, p)
-    elif args.visualization == "network":
-        p = args.path if args.path else "network_animation.gif"
-        create_network(args.xWidth, args.yHeight, args.numberSteps, p)
-    else:
-        print(f"Invalid parameter provided, expected 'wave' or 'network', but received: {
-              args.visualization}")
+    metrics = RenderMetrics(alert_seconds=args.alertSeconds)
+    p, render = build_render(args, metrics)
+
+    if render is None:
+        print(f"Invalid parameter provided, expected one of {REGISTRY.names()}, 'batch' or 'stitch', "
+              f"but received: {args.visualization}")
+
+    if render is not None and args.profile:
+        import cProfile
+
+        unprofiled = render
+
+        def render():
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(unprofiled)
+            finally:
+                profiler.dump_stats(args.profile)
+                print(f"Profile written to '{args.profile}'")
+
+    if render is not None and args.preview:
+        render()
+    elif render is not None and args.cache and (args.output or args.frames):
+        print("The render cache only serves complete single --path renders, rendering without it")
+        withSuccess = render() is not None
+    elif render is not None and args.cache:
+        cache = RenderCache(args.cacheDir, int(args.cacheMaxMb * 1024 ** 2))
+        withSuccess = render_cached(cache, args, p, render)
+        print(cache.summary())
+    elif render is not None:
+        withSuccess = render() is not None
+
+    if metrics.phases:
+        print(metrics.summary())
+
+    if metrics.slow():
+        print(f"⚠️  Slow render: {metrics.wall_time():.1f}s, "
+              f"more than the {args.alertSeconds:.1f}s limit")
+
+    if render is not None and args.metrics:
+        metrics.write(args.metrics, visualization=args.visualization, path=p,
+                      success=withSuccess, arguments=vars(args))
 
     if withSuccess:
-        print(f"\n✅ Success! The Animation has been saved as '{args.path}'")
+        print(f"\n✅ Success! The Animation has been saved as '{p}'")
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+# Libraries whose version changes the rendered pixels or the encoding
+LIBRARIES = ("matplotlib", "numpy", "seaborn", "scipy", "pillow")
+
+
+def code_version():
+    """Hash of the rendering code and the library versions it runs on"""
+    # importlib.metadata is slow to import, only pay for it when the cache is used
+    from importlib import metadata
+
+    digest = hashlib.sha256()
+    root = Path(__file__).resolve().parent
+
+    for path in sorted([*root.glob("*.py"), root.parent / "render.py"]):
+        if path.exists():
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+
+    for library in LIBRARIES:
+        try:
+            digest.update(f"{library}=={metadata.version(library)}".encode())
+        except metadata.PackageNotFoundError:
+            digest.update(f"{library} missing".encode())
+
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Content-addressed store of rendered files with size-bounded LRU eviction"""
+
+    def __init__(self, directory=".render_cache", max_bytes=2 * 1024 ** 3):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.stats_path = self.directory / "stats.json"
+
+    def key(self, parameters):
+        """Hash every input that determines the output, including the code itself"""
+        payload = json.dumps({"parameters": parameters, "code": code_version()},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def entry(self, key, suffix):
+        return self.directory / f"{key}{suffix}"
+
+    def fetch(self, key, destination):
+        """Copy a cached render to destination, return whether it was a hit"""
+        entry = self.entry(key, Path(destination).suffix)
+
+        if not entry.exists():
+            self.record(misses=1)
+            return False
+
+        shutil.copyfile(entry, destination)
+        # The modification time tracks the last use for LRU eviction
+        os.utime(entry)
+        self.record(hits=1, bytes_saved=entry.stat().st_size)
+
+        return True
+
+    def store(self, key, source):
+        """Add a finished render to the cache and evict the least recently used files"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = self.entry(key, Path(source).suffix)
+
+        # Copy next to the entry first, so readers never see a partial file
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(source, temporary)
+        os.replace(temporary, entry)
+
+        self.evict()
+
+    def entries(self):
+        return [path for path in self.directory.glob("*")
+                if path.is_file() and path != self.stats_path and path.suffix != ".tmp"]
+
+    def evict(self):
+        entries = sorted(self.entries(), key=lambda path: path.stat().st_mtime)
+        total = sum(path.stat().st_size for path in entries)
+
+        while entries and total > self.max_bytes:
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink()
+            self.record(evictions=1)
+
+    def stats(self):
+        try:
+            stats = json.loads(self.stats_path.read_text())
+        except (OSError, ValueError):
+            stats = {}
+
+        for counter in ("hits", "misses", "evictions", "bytes_saved"):
+            stats.setdefault(counter, 0)
+
+        return stats
+
+    def record(self, **counters):
+        if not self.directory.exists():
+            self.directory.mkdir(parents=True)
+
+        stats = self.stats()
+        for counter, value in counters.items():
+            stats[counter] += value
+        stats["updated"] = time.time()
+
+        temporary = self.stats_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(stats, indent=2))
+        os.replace(temporary, self.stats_path)
+
+    def summary(self):
+        stats = self.stats()
+        size = sum(path.stat().st_size for path in self.entries()) if self.directory.exists() else 0
+
+        return (f"Render cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['bytes_saved'] / 1e6:.1f} MB saved, "
+                f"{size / 1e6:.1f}/{self.max_bytes / 1e6:.0f} MB used")
@@ -0,0 +1,47 @@
+from functools import lru_cache
+
+import matplotlib as mpl
+import numpy as np
+
+from visualizations.options import PHASE_PALETTES
+
+
+@lru_cache(maxsize=None)
+def phase_palette(palette="hls", resolution=256):
+    """Float RGBA table sampling a cyclic palette over [0, 2π), built once per process"""
+    if palette not in PHASE_PALETTES:
+        raise ValueError(f"Unknown phase palette '{palette}', expected one of {PHASE_PALETTES}")
+
+    if resolution < 1:
+        raise ValueError(f"Expected a color resolution of 1 or more, received: {resolution}")
+
+    if palette in ("hls", "husl"):
+        import seaborn as sns
+
+        # Same colors as sns.color_palette(palette, as_cmap=True) for 256 entries
+        colors = np.array(sns.color_palette(palette, resolution))
+        table = np.column_stack([colors, np.ones(resolution)])
+    else:
+        table = mpl.colormaps[palette](np.arange(resolution) / resolution)
+
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=None)
+def phase_lut(palette="hls", resolution=256):
+    """uint8 RGBA version of phase_palette for raw frame buffers"""
+    table = np.round(phase_palette(palette, resolution) * 255).astype(np.uint8)
+
+    table.flags.writeable = False
+    return table
+
+
+def phase_indices(angle, resolution=256):
+    """Index into a phase table of the given resolution for every angle"""
+    # Same arithmetic as matplotlib's colormap lookup
+    index = (np.asarray(angle) % (2 * np.pi)) / (2 * np.pi) * resolution
+    index = index.astype(np.intp)
+    index[index == resolution] = resolution - 1
+
+    return index
@@ -0,0 +1,76 @@
+import subprocess
+from pathlib import Path
+
+import matplotlib as mpl
+import numpy as np
+
+
+class FFmpegWriter:
+    """Pipe raw RGB(A) frames into an ffmpeg subprocess over stdin
+
+    `output_args` are passed to ffmpeg in front of the output path.
+    """
+
+    def __init__(self, path, fps, codec=None, output_args=()):
+        self.path = path
+        self.fps = fps
+        self.codec = codec if codec is not None else mpl.rcParams["animation.codec"]
+        self.output_args = list(output_args)
+        self.process = None
+
+    def command(self, width, height, pix_fmt):
+        # Mirrors the arguments of matplotlib's FFMpegWriter, so all
+        # backends produce comparable files
+        args = [mpl.rcParams["animation.ffmpeg_path"],
+                "-f", "rawvideo", "-vcodec", "rawvideo",
+                "-s", f"{width}x{height}", "-pix_fmt", pix_fmt,
+                "-framerate", str(self.fps), "-loglevel", "error",
+                "-i", "pipe:", "-vcodec", self.codec]
+        if self.codec in ("h264", "libvpx-vp9"):
+            args += ["-pix_fmt", "yuv420p"]
+            # yuv420p needs even frame sizes, an odd last row or column is cropped off
+            # like matplotlib's writer rounds the figure size
+            if width % 2 or height % 2:
+                args += ["-vf", f"crop={width - width % 2}:{height - height % 2}:0:0"]
+
+        return args + self.output_args + ["-y", str(self.path)]
+
+    def __enter__(self):
+        return self
+
+    def write(self, frame):
+        if self.process is None:
+            # Frame size and layout are taken from the first frame
+            height, width, channels = frame.shape
+            pix_fmt = "rgba" if channels == 4 else "rgb24"
+            self.process = subprocess.Popen(self.command(width, height, pix_fmt),
+                                            stdin=subprocess.PIPE)
+
+        self.process.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8).data)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.process is None:
+            return
+
+        self.process.stdin.close()
+        returncode = self.process.wait()
+
+        if returncode != 0 and exc_type is None:
+            raise RuntimeError(f"ffmpeg exited with status {returncode} while writing '{self.path}'")
+
+
+def concat_videos(paths, output):
+    """Losslessly join video files with the same encoding settings"""
+    list_file = f"{output}.concat.txt"
+
+    with open(list_file, "w") as f:
+        for path in paths:
+            escaped = str(Path(path).resolve()).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    try:
+        subprocess.run([mpl.rcParams["animation.ffmpeg_path"], "-loglevel", "error",
+                        "-f", "concat", "-safe", "0", "-i", list_file,
+                        "-c", "copy", "-y", str(output)], check=True)
+    finally:
+        Path(list_file).unlink()
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class FrameCache:
+    """Memory-bounded store of rendered frames, keyed e.g. by the phase of a loop
+
+    Once the cap is reached, new frames are no longer stored instead of
+    evicting old ones: frames of a loop are requested in cyclic order, where
+    LRU eviction would turn every later lookup into a miss.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        frame = self.frames.get(key)
+
+        if frame is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return frame
+
+    def put(self, key, frame):
+        """Store a copy of frame if it fits, return the stored frame or None"""
+        if key in self.frames or self.nbytes + frame.nbytes > self.max_bytes:
+            return self.frames.get(key)
+
+        stored = np.array(frame)
+        stored.flags.writeable = False
+        self.frames[key] = stored
+        self.nbytes += stored.nbytes
+
+        return stored
+
+    def clear(self):
+        self.frames.clear()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.frames)
@@ -0,0 +1,225 @@
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+# Palette index left unused by the quantizer, marks pixels that did not change
+TRANSPARENT = 255
+
+# The most frequent colors (background, outlines) enter the palette exactly
+EXACT_COLORS = 64
+
+
+def pack_colors(pixels):
+    """24 bit integer key of each RGB pixel"""
+    pixels = pixels.astype(np.uint32)
+    return (pixels[..., 0] << 16) | (pixels[..., 1] << 8) | pixels[..., 2]
+
+
+def unpack_colors(keys):
+    return np.stack([keys >> 16, (keys >> 8) & 255, keys & 255], axis=-1).astype(np.uint8)
+
+
+def build_palette(frames):
+    """Palette of 255 colors for sample frames, as a (255, 3) uint8 array"""
+    # Every other pixel of every sample is plenty to find the colors
+    pixels = np.concatenate([np.asarray(frame)[::2, ::2, :3].reshape(-1, 3) for frame in frames])
+    keys, counts = np.unique(pack_colors(pixels), return_counts=True)
+
+    if len(keys) <= TRANSPARENT:
+        return unpack_colors(keys)
+
+    # Median cut alone averages the dominant flat colors away
+    exact = keys[np.argsort(counts)[::-1][:EXACT_COLORS]]
+    rest = pixels[~np.isin(pack_colors(pixels), exact)]
+    quantized = Image.fromarray(np.ascontiguousarray(rest[None])).quantize(
+        TRANSPARENT - EXACT_COLORS, dither=Image.Dither.NONE)
+    colors = np.array(quantized.getpalette()[:3 * (TRANSPARENT - EXACT_COLORS)], dtype=np.uint8)
+
+    return np.concatenate([unpack_colors(exact), colors.reshape(-1, 3)])
+
+
+class GifWriter:
+    """Stream RGB(A) frames to an endlessly looping GIF with one global palette
+
+    Every frame only stores the rectangle that changed since the previous
+    frame, unchanged pixels inside it are transparent. Identical frames are
+    merged into a longer delay. `palette_source` returns sample frames the
+    palette is built from, by default the first frame is used.
+    """
+
+    def __init__(self, path, fps, palette_source=None):
+        self.path = path
+        self.fps = fps
+        self.palette_source = palette_source
+        self.file = None
+        self.palette = None
+        self.lookup = None
+        self.previous = None
+        self.indices = None
+        self.pending = None
+
+    def __enter__(self):
+        # Samples are rendered here, on the thread that owns the figure,
+        # even when frames are later written from an encoder thread
+        if self.palette_source is not None:
+            self.palette = build_palette(self.palette_source())
+        return self
+
+    def quantize(self, pixels):
+        """Nearest palette index of (N, 3) pixels, memoized per color"""
+        keys = pack_colors(pixels)
+        indices = self.lookup[keys]
+        unknown = indices == TRANSPARENT
+
+        if unknown.any():
+            new = np.unique(keys[unknown])
+            colors = unpack_colors(new).astype(np.float32)
+            palette = self.palette.astype(np.float32)
+            # Squared distances as |c|^2 - 2 c.p + |p|^2, one matrix product
+            distance = (palette ** 2).sum(axis=1) - 2 * colors @ palette.T
+            self.lookup[new] = distance.argmin(axis=1)
+            indices = self.lookup[keys]
+
+        return indices
+
+    def write(self, frame):
+        rgb = np.ascontiguousarray(frame[..., :3], dtype=np.uint8)
+
+        if self.file is None:
+            self.start(rgb)
+
+        # Same settings as matplotlib's pillow writer
+        duration = int(1000 / self.fps)
+
+        if self.previous is None:
+            self.indices = self.quantize(rgb.reshape(-1, 3)).reshape(rgb.shape[:2])
+            self.flush()
+            self.pending = [self.indices.copy(), (0, 0), duration]
+            self.previous = rgb.copy()
+            return
+
+        # Only pixels that changed are quantized and encoded
+        changed = (rgb != self.previous).any(axis=2)
+        if changed.any():
+            np.copyto(self.previous, rgb)
+            previous_indices = self.indices[changed]
+            self.indices[changed] = self.quantize(rgb[changed])
+            changed[changed] = self.indices[changed] != previous_indices
+
+        if not changed.any():
+            self.pending[2] += duration
+            return
+
+        rows = np.flatnonzero(changed.any(axis=1))
+        columns = np.flatnonzero(changed.any(axis=0))
+        y0, y1, x0, x1 = rows[0], rows[-1] + 1, columns[0], columns[-1] + 1
+
+        patch = np.where(changed[y0:y1, x0:x1], self.indices[y0:y1, x0:x1], TRANSPARENT)
+        self.flush()
+        self.pending = [patch.astype(np.uint8), (int(x0), int(y0)), duration]
+
+    def start(self, rgb):
+        if self.palette is None:
+            self.palette = build_palette([rgb])
+        # 255 marks colors whose nearest palette entry is not known yet
+        self.lookup = np.full(1 << 24, TRANSPARENT, dtype=np.uint8)
+
+        table = np.zeros((256, 3), dtype=np.uint8)
+        table[:len(self.palette)] = self.palette
+
+        height, width = rgb.shape[:2]
+        self.file = open(self.path, "wb")
+        self.file.write(b"GIF89a" + width.to_bytes(2, "little") + height.to_bytes(2, "little")
+                        + bytes([0xF7, 0, 0]) + table.tobytes())
+        # Netscape extension, loop count 0 repeats forever
+        self.file.write(b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    def flush(self):
+        """Encode the pending frame, its delay is final once the next frame differs"""
+        if self.pending is None:
+            return
+
+        indices, offset, duration = self.pending
+        # Disposal 1 keeps the frame on the canvas, the next patch is drawn on top
+        for data in GifImagePlugin.getdata(Image.fromarray(indices), offset, duration=duration,
+                                           transparency=TRANSPARENT, disposal=1):
+            self.file.write(data)
+
+        self.pending = None
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.file is None:
+            return
+
+        try:
+            if exc_type is None:
+                self.flush()
+                self.file.write(b"\x3b")
+        finally:
+            self.file.close()
+
+
+def read_blocks(data, pos):
+    """Split the GIF body starting at pos into (kind, bytes) blocks"""
+    blocks = []
+
+    while pos < len(data):
+        start = pos
+        kind = data[pos]
+
+        if kind == 0x3B:  # trailer
+            break
+        elif kind == 0x21:  # extension: label, then sub-blocks
+            pos += 2
+        elif kind == 0x2C:  # image: descriptor, local color table, LZW code size
+            packed = data[pos + 9]
+            pos += 10
+            if packed & 0x80:
+                pos += 3 << ((packed & 0x07) + 1)
+            pos += 1
+        else:
+            raise ValueError(f"Unexpected GIF block 0x{kind:02x} at offset {pos}")
+
+        while data[pos] != 0:
+            pos += data[pos] + 1
+        pos += 1
+
+        blocks.append((kind, data[start:pos]))
+
+    return blocks
+
+
+def split_gif(data):
+    """Return (header, global color table, blocks) of a GIF file"""
+    if data[:6] not in (b"GIF87a", b"GIF89a"):
+        raise ValueError("Not a GIF file")
+
+    packed = data[10]
+    table_size = 3 << ((packed & 0x07) + 1) if packed & 0x80 else 0
+
+    return data[:13], data[13:13 + table_size], read_blocks(data, 13 + table_size)
+
+
+def concat_gifs(paths, output):
+    """Losslessly join GIF files of the same size by copying their frame blocks"""
+    header, global_table, _ = split_gif(open(paths[0], "rb").read())
+    result = [header, global_table]
+
+    for index, path in enumerate(paths):
+        _, table, blocks = split_gif(open(path, "rb").read())
+
+        for kind, block in blocks:
+            if kind == 0x21 and block[1] == 0xFF and index > 0:
+                # The looping extension is only needed once
+                continue
+
+            if kind == 0x2C and not block[9] & 0x80 and table != global_table:
+                # Frames relying on another global palette get it as local table
+                packed = (block[9] & 0xF8) | 0x80 | (len(table).bit_length() - 3)
+                block = block[:9] + bytes([packed]) + table + block[10:]
+
+            result.append(block)
+
+    result.append(b"\x3B")
+
+    with open(output, "wb") as f:
+        f.write(b"".join(result))
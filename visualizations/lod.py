@@ -0,0 +1,52 @@
+import numpy as np
+
+
+def decimate(points, columns, buckets):
+    """Merge consecutive segments sharing a pixel column and a color bucket into polylines
+
+    `points` holds the n + 1 vertices of the curve, `columns` and `buckets`
+    the pixel column and color bucket of each of its n segments. Every run of
+    segments is reduced to its first, lowest, highest and last vertex, which
+    covers the same pixels once stroked. Returns the (runs, 4, 2) polylines
+    and the index of the first segment of every run.
+    """
+    n = len(points) - 1
+    change = (np.diff(columns) != 0) | (np.diff(buckets) != 0)
+    starts = np.concatenate(([0], np.flatnonzero(change) + 1))
+    ends = np.concatenate((starts[1:], [n]))
+
+    # Sorting by (run, y) puts the lowest vertex of each run first and the
+    # highest last, runs keep their positions
+    run = np.repeat(np.arange(len(starts)), ends - starts)
+    order = np.lexsort((points[:-1, 1], run))
+    lowest = order[starts]
+    highest = order[ends - 1]
+
+    # The end vertex of a run may be its extreme as well
+    last_is_lower = points[ends, 1] < points[lowest, 1]
+    last_is_higher = points[ends, 1] > points[highest, 1]
+    lowest = np.where(last_is_lower, ends, lowest)
+    highest = np.where(last_is_higher, ends, highest)
+
+    vertices = np.sort(np.stack([starts, lowest, highest, ends], axis=1), axis=1)
+
+    return points[vertices], starts
+
+
+def polylines_to_segments(polylines, colors):
+    """Split polylines into their segments, repeating each polyline's color"""
+    segments = np.stack([polylines[:, :-1], polylines[:, 1:]], axis=2).reshape(-1, 2, 2)
+
+    return segments, np.repeat(colors, polylines.shape[1] - 1, axis=0)
+
+
+def frame_error(reference, frame):
+    """Pixel difference between two RGB frames of the same size"""
+    diff = np.abs(reference.astype(np.int16) - frame.astype(np.int16)).max(axis=-1)
+
+    return {
+        "mean_error": float(diff.mean()),
+        "max_error": int(diff.max()),
+        # Differences above ~3% of the range are the first ones to be noticeable
+        "visible_pixels": float((diff > 8).mean()),
+    }
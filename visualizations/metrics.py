@@ -0,0 +1,116 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+
+def format_seconds(seconds):
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s"
+
+
+class RenderMetrics:
+    """Wall time per render phase plus live frame progress
+
+    Phases may nest, the time of a nested phase is only counted for the
+    innermost one, so the phase totals add up to the instrumented time.
+    """
+
+    def __init__(self, progress=True, alert_seconds=None, stream=sys.stderr):
+        self.progress = progress
+        self.alert_seconds = alert_seconds
+        self.stream = stream
+        self.phases = {}
+        self.calls = {}
+        self.nested = []
+        self.created = time.perf_counter()
+        self.total_frames = None
+        self.frames = 0
+        self.frames_started = None
+        self.last_report = 0.0
+        self.alerted = False
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        self.nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = self.nested.pop()
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed - inner
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if self.nested:
+                self.nested[-1] += elapsed
+
+    def start_frames(self, total):
+        self.total_frames = total
+        self.frames = 0
+        self.frames_started = time.perf_counter()
+
+    def frames_done(self, count=1):
+        self.frames += count
+        now = time.perf_counter()
+
+        # Throttled, so reporting stays cheap for very fast frames
+        if now - self.last_report >= 0.5 or self.frames == self.total_frames:
+            self.last_report = now
+            self.report_progress(now)
+
+    def fps(self):
+        if self.frames_started is None or self.frames == 0:
+            return 0.0
+
+        return self.frames / (time.perf_counter() - self.frames_started)
+
+    def report_progress(self, now):
+        fps = self.fps()
+        remaining = (self.total_frames - self.frames) / fps if fps else 0.0
+
+        # The first frames include warm-up, the estimate is only trusted after a second
+        if (self.alert_seconds is not None and not self.alerted
+                and now - self.frames_started > 1.0
+                and now - self.created + remaining > self.alert_seconds):
+            self.alerted = True
+            self.stream.write(f"\n⚠️  Render is expected to take "
+                              f"{format_seconds(now - self.created + remaining)}, "
+                              f"more than the {format_seconds(self.alert_seconds)} limit\n")
+
+        if self.progress:
+            end = "\n" if self.frames == self.total_frames else ""
+            self.stream.write(f"\rFrame {self.frames}/{self.total_frames} "
+                              f"({self.frames / self.total_frames:.0%}), {fps:.1f} frames/s, "
+                              f"ETA {format_seconds(remaining)}   {end}")
+            self.stream.flush()
+
+    def wall_time(self):
+        return time.perf_counter() - self.created
+
+    def slow(self):
+        return self.alert_seconds is not None and self.wall_time() > self.alert_seconds
+
+    def summary(self):
+        total = sum(self.phases.values()) or 1.0
+        parts = ", ".join(f"{name} {seconds:.2f}s ({seconds / total:.0%})"
+                          for name, seconds in sorted(self.phases.items(),
+                                                      key=lambda item: -item[1]))
+        return f"Render phases: {parts}"
+
+    def to_dict(self):
+        return {
+            "wall_time": self.wall_time(),
+            "frames": self.frames,
+            "fps": self.fps(),
+            "phases": {name: {"seconds": seconds, "calls": self.calls[name]}
+                       for name, seconds in self.phases.items()},
+            "alert_seconds": self.alert_seconds,
+            "slow": self.slow(),
+        }
+
+    def write(self, destination, **extra):
+        with open(destination, "w") as f:
+            json.dump({**extra, **self.to_dict()}, f, indent=2, default=str)
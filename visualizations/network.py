@@ -1,20 +1,59 @@
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from matplotlib.patches import Circle
+from matplotlib.collections import EllipseCollection, LineCollection
 import math
-from pathlib import Path
+
+import numpy as np
+
+from visualizations.frame_cache import FrameCache
+from visualizations.metrics import RenderMetrics
+from visualizations.parallel import encode_frames
+from visualizations.preview import Preview
+from visualizations.vector import VectorScene, save_vector_outputs
+from visualizations.writers import Output
+
+
+# Layer sizes of the default network, input layer first
+DEFAULT_LAYERS = (3, 5, 6, 5, 6, 5, 3)
+
+# Layer appearance: node color, animated base color, phase offset per node.
+# Input and output layers use the first and last style, hidden layers cycle through the rest
+LAYER_STYLES = [
+    ('blue', (0.2, 0.4, 0.8), 0.5),
+    ('green', (0.2, 0.8, 0.4), 0.3),
+    ('orange', (1.0, 0.6, 0.2), 0.4),
+    ('purple', (0.6, 0.2, 0.8), 0.5),
+    ('cyan', (0.2, 0.8, 0.8), 0.4),
+    ('magenta', (0.8, 0.2, 0.6), 0.6),
+    ('red', (0.8, 0.4, 0.2), 0.7),
+]
+
+
+# Keyframes per cycle of vector exports, the pulses are smooth enough to interpolate linearly
+VECTOR_KEYFRAMES = 40
 
 
 class NeuralNetworkAnimation:
-    def __init__(self, w: int, h: int, steps: int):
+    def __init__(self, w: int, h: int, steps: int, dpi: float = None,
+                 frame_cache_mb: float = 1024, metrics: RenderMetrics = None,
+                 layers=DEFAULT_LAYERS, max_edges: int = None):
         if w <= 0 or h <= 0:
             print(f"Width and height should be >0. They are w: {w}, h: {h}")
             return
 
+        if len(layers) < 2 or min(layers) < 1:
+            raise ValueError(f"Expected at least two layers with one node or more, received: {layers}")
+
+        if max_edges is not None and max_edges < 1:
+            raise ValueError(f"Expected max_edges of 1 or more, received: {max_edges}")
+
         self.w = w
         self.h = h
+        self.steps = steps
+        self.dpi = dpi
+        self.max_edges = max_edges
+        self.metrics = metrics if metrics is not None else RenderMetrics(progress=False)
 
-        self.fig, self.ax = plt.subplots(figsize=(w, h))
+        self.fig, self.ax = plt.subplots(figsize=(w, h), dpi=dpi)
 
         # Adjust coordinate system ratio
         self.ax.set_xlim(0, self.w)
@@ -22,353 +61,353 @@ class NeuralNetworkAnimation:
         self.ax.set_aspect('equal')
         self.ax.axis('off')
 
-        # Network architecture parameters
-        # TODO: Make configurationpip install ipywidgets more user friendly
-        self.input_nodes = 3
-        self.hidden1_nodes = 5
-        self.hidden2_nodes = 6
-        self.hidden3_nodes = 5
-        self.hidden4_nodes = 6
-        self.hidden5_nodes = 5
-        self.output_nodes = 3
-
-        # Find maximum nodes for consistent spacing
-        self.max_nodes = max(
-            self.input_nodes,
-            self.hidden1_nodes,
-            self.hidden2_nodes,
-            self.hidden3_nodes,
-            self.hidden4_nodes,
-            self.hidden5_nodes,
-            self.output_nodes
-        )
-
-        # Layer positions - centered
-        # TODO: determine automatically
-        self.input_x = 3
-        self.hidden1_x = 6
-        self.hidden2_x = 9
-        self.hidden3_x = 12
-        self.hidden4_x = 15
-        self.hidden5_x = 18
-        self.output_x = 21
+        # Network architecture: nodes per layer, layers evenly spread over the width
+        self.layer_sizes = tuple(int(size) for size in layers)
+        self.max_nodes = max(self.layer_sizes)
+        self.layer_spacing = self.w / (len(self.layer_sizes) + 1)
+        layer_x = self.layer_spacing * np.arange(1, len(self.layer_sizes) + 1)
 
         # Node positions - all layers use same spacing based on max nodes
-        self.input_positions = self.calculate_node_positions(
-            self.input_nodes, self.input_x, self.max_nodes
-        )
-        self.hidden1_positions = self.calculate_node_positions(
-            self.hidden1_nodes, self.hidden1_x, self.max_nodes
-        )
-        self.hidden2_positions = self.calculate_node_positions(
-            self.hidden2_nodes, self.hidden2_x, self.max_nodes
-        )
-        self.hidden3_positions = self.calculate_node_positions(
-            self.hidden3_nodes, self.hidden3_x, self.max_nodes
-        )
-        self.hidden4_positions = self.calculate_node_positions(
-            self.hidden4_nodes, self.hidden4_x, self.max_nodes
-        )
-        self.hidden5_positions = self.calculate_node_positions(
-            self.hidden5_nodes, self.hidden5_x, self.max_nodes
-        )
-        self.output_positions = self.calculate_node_positions(
-            self.output_nodes, self.output_x, self.max_nodes
-        )
+        positions = [self.calculate_node_positions(size, x)
+                     for size, x in zip(self.layer_sizes, layer_x)]
+
+        # Nodes shrink once layers get too dense for the default radius
+        self.node_radius = min(0.3, 0.4 * self.node_spacing(), 0.4 * self.layer_spacing)
 
         # Animation parameters
         self.time = 0
+        self.total_frames = 120  # frames per complete cycle
+        self.fps = 12
+
+        # The animation is periodic, every phase of the loop is rendered once
+        self.frame_cache_mb = frame_cache_mb
+        self.frame_cache = FrameCache(frame_cache_mb * 1024 ** 2)
         self.animation_speed = 1.0 / steps if steps else 20
 
-        # Store circles and lines for animation
-        self.input_circles = []
-        self.hidden1_circles = []
-        self.hidden2_circles = []
-        self.hidden3_circles = []
-        self.hidden4_circles = []
-        self.hidden5_circles = []
-        self.output_circles = []
-        self.connections = []
+        # Layer appearance: node color, animated base color, phase offset per node
+        self.layers = [(layer_positions, *self.layer_style(index))
+                       for index, layer_positions in enumerate(positions)]
+
+        # Nodes and edges are each a single collection for animation
+        self.node_collection = None
+        self.edge_collection = None
 
         self.create_network()
 
-    def calculate_node_positions(self, num_nodes, x_pos, max_nodes):
-        """Calculate y positions for nodes in a layer with same spacing"""
-        if num_nodes == 1:
-            return [(x_pos, self.h / 2)]
+    def layer_style(self, index):
+        if index == 0:
+            return LAYER_STYLES[0]
+        if index == len(self.layer_sizes) - 1:
+            return LAYER_STYLES[-1]
 
-        # Calculate spacing based on the maximum number of nodes across all layers
-        # This ensures all layers have the same vertical spacing
-        total_height = math.ceil(self.h * 0.8)  # leave some marign
-        spacing = total_height / (max_nodes - 1)
+        hidden = LAYER_STYLES[1:-1]
+        return hidden[(index - 1) % len(hidden)]
+
+    def node_spacing(self):
+        """Vertical distance of neighboring nodes, shared by all layers"""
+        # Leave some margin
+        total_height = math.ceil(self.h * 0.8)
+        return total_height / max(self.max_nodes - 1, 1)
+
+    def calculate_node_positions(self, num_nodes, x_pos):
+        """Calculate (x, y) positions for nodes in a layer with same spacing"""
+        if num_nodes == 1:
+            return np.array([(x_pos, self.h / 2)])
 
         # Center the nodes vertically
-        start_y = (9 - (num_nodes - 1) * spacing) / 2
+        spacing = self.node_spacing()
+        start_y = (self.h - (num_nodes - 1) * spacing) / 2
+        y = start_y + np.arange(num_nodes) * spacing
 
-        positions = []
-        for i in range(num_nodes):
-            y = start_y + i * spacing
-            positions.append((x_pos, y))
-        return positions
+        return np.column_stack([np.full(num_nodes, x_pos, dtype=float), y])
 
     def create_network(self):
         self.create_connections()
 
-        for pos in self.input_positions:
-            circle = Circle(pos, 0.3, color='blue', alpha=0.7, zorder=10)
-            self.input_circles.append(circle)
-            self.ax.add_patch(circle)
-
-        for pos in self.hidden1_positions:
-            circle = Circle(pos, 0.3, color='green', alpha=0.7, zorder=10)
-            self.hidden1_circles.append(circle)
-            self.ax.add_patch(circle)
-
-        for pos in self.hidden2_positions:
-            circle = Circle(pos, 0.3, color='orange', alpha=0.7, zorder=10)
-            self.hidden2_circles.append(circle)
-            self.ax.add_patch(circle)
-
-        for pos in self.hidden3_positions:
-            circle = Circle(pos, 0.3, color='purple', alpha=0.7, zorder=10)
-            self.hidden3_circles.append(circle)
-            self.ax.add_patch(circle)
-
-        for pos in self.hidden4_positions:
-            circle = Circle(pos, 0.3, color='cyan', alpha=0.7, zorder=10)
-            self.hidden4_circles.append(circle)
-            self.ax.add_patch(circle)
-
-        for pos in self.hidden5_positions:
-            circle = Circle(pos, 0.3, color='magenta', alpha=0.7, zorder=10)
-            self.hidden5_circles.append(circle)
-            self.ax.add_patch(circle)
-
-        for pos in self.output_positions:
-            circle = Circle(pos, 0.3, color='red', alpha=0.7, zorder=10)
-            self.output_circles.append(circle)
-            self.ax.add_patch(circle)
+        positions = np.concatenate([layer[0] for layer in self.layers])
+        colors = [color for layer in self.layers for color in [layer[1]] * len(layer[0])]
+
+        # Per-node animation constants
+        self.node_base_colors = np.concatenate(
+            [np.tile(layer[2], (len(layer[0]), 1)) for layer in self.layers])
+        self.node_time_offsets = np.concatenate(
+            [np.arange(len(layer[0])) * layer[3] for layer in self.layers])
+
+        diameter = 2 * self.node_radius
+        self.node_collection = EllipseCollection(
+            diameter, diameter, 0, units='xy', offsets=positions,
+            offset_transform=self.ax.transData, color=colors, alpha=0.7, zorder=10)
+        self.ax.add_collection(self.node_collection, autolim=False)
 
     def create_connections(self):
-        # TODO: rework layer configuration
-        node_radius = 0.3
-
-        # Input -> Hidden1
-        for i, input_pos in enumerate(self.input_positions):
-            for j, hidden1_pos in enumerate(self.hidden1_positions):
-                # Calculate connection endpoints that stop at node edges
-                start_x, start_y = self.get_connection_endpoint(
-                    input_pos, hidden1_pos, node_radius, 'start')
-                end_x, end_y = self.get_connection_endpoint(
-                    input_pos, hidden1_pos, node_radius, 'end')
-
-                line, = self.ax.plot([start_x, end_x],
-                                     [start_y, end_y],
-                                     'k-', alpha=0.3, linewidth=0.5, zorder=1)
-                self.connections.append(line)
-
-        # Hidden1 -> Hidden2 connections
-        for i, hidden1_pos in enumerate(self.hidden1_positions):
-            for j, hidden2_pos in enumerate(self.hidden2_positions):
-                # Calculate connection endpoints that stop at node edges
-                start_x, start_y = self.get_connection_endpoint(
-                    hidden1_pos, hidden2_pos, node_radius, 'start')
-                end_x, end_y = self.get_connection_endpoint(
-                    hidden1_pos, hidden2_pos, node_radius, 'end')
-
-                line, = self.ax.plot([start_x, end_x],
-                                     [start_y, end_y],
-                                     'k-', alpha=0.3, linewidth=0.5, zorder=1)
-                self.connections.append(line)
-
-        # Hidden2 -> Hidden3 connections
-        for i, hidden2_pos in enumerate(self.hidden2_positions):
-            for j, hidden3_pos in enumerate(self.hidden3_positions):
-                # Calculate connection endpoints that stop at node edges
-                start_x, start_y = self.get_connection_endpoint(
-                    hidden2_pos, hidden3_pos, node_radius, 'start')
-                end_x, end_y = self.get_connection_endpoint(
-                    hidden2_pos, hidden3_pos, node_radius, 'end')
-
-                line, = self.ax.plot([start_x, end_x],
-                                     [start_y, end_y],
-                                     'k-', alpha=0.3, linewidth=0.5, zorder=1)
-                self.connections.append(line)
-
-        # Hidden3 -> Hidden4 connections
-        for i, hidden3_pos in enumerate(self.hidden3_positions):
-            for j, hidden4_pos in enumerate(self.hidden4_positions):
-                # Calculate connection endpoints that stop at node edges
-                start_x, start_y = self.get_connection_endpoint(
-                    hidden3_pos, hidden4_pos, node_radius, 'start')
-                end_x, end_y = self.get_connection_endpoint(
-                    hidden3_pos, hidden4_pos, node_radius, 'end')
-
-                line, = self.ax.plot([start_x, end_x],
-                                     [start_y, end_y],
-                                     'k-', alpha=0.3, linewidth=0.5, zorder=1)
-                self.connections.append(line)
-
-        # Hidden4 -> Hidden5 connections
-        for i, hidden4_pos in enumerate(self.hidden4_positions):
-            for j, hidden5_pos in enumerate(self.hidden5_positions):
-                # Calculate connection endpoints that stop at node edges
-                start_x, start_y = self.get_connection_endpoint(
-                    hidden4_pos, hidden5_pos, node_radius, 'start')
-                end_x, end_y = self.get_connection_endpoint(
-                    hidden4_pos, hidden5_pos, node_radius, 'end')
-
-                line, = self.ax.plot([start_x, end_x],
-                                     [start_y, end_y],
-                                     'k-', alpha=0.3, linewidth=0.5, zorder=1)
-                self.connections.append(line)
-
-        # Hidden5 -> Output connections
-        for i, hidden5_pos in enumerate(self.hidden5_positions):
-            for j, output_pos in enumerate(self.output_positions):
-                # Calculate connection endpoints that stop at node edges
-                start_x, start_y = self.get_connection_endpoint(
-                    hidden5_pos, output_pos, node_radius, 'start')
-                end_x, end_y = self.get_connection_endpoint(
-                    hidden5_pos, output_pos, node_radius, 'end')
-
-                line, = self.ax.plot([start_x, end_x],
-                                     [start_y, end_y],
-                                     'k-', alpha=0.3, linewidth=0.5, zorder=1)
-                self.connections.append(line)
-
-    def get_connection_endpoint(self, start_pos, end_pos, radius, which_end):
-        """Calculate connection endpoint that stops at node edge"""
-        x1, y1 = start_pos
-        x2, y2 = end_pos
-
-        # Calculate direction vector
-        dx = x2 - x1
-        dy = y2 - y1
-        distance = math.sqrt(dx*dx + dy*dy)
-
-        if distance == 0:
-            return (x1, y1)
-
-        # Normalize direction vector
-        dx_norm = dx / distance
-        dy_norm = dy / distance
-
-        if which_end == 'start':
-            # Move from start position towards end by radius distance
-            return (x1 + dx_norm * radius, y1 + dy_norm * radius)
-        else:  # which_end == 'end'
-            # Move from end position towards start by radius distance
-            return (x2 - dx_norm * radius, y2 - dy_norm * radius)
-
-    def get_animated_color(self, base_color, time_offset=0):
-        """Generate animated RGB color based on time"""
+        # Fully connected layer pairs, edges ordered by source, then target node
+        strokes, offset = [], 0
+        for (sources, *_), (targets, *_) in zip(self.layers, self.layers[1:]):
+            strokes.append(self.connect_layers(sources, targets, offset))
+            offset += len(sources) * len(targets)
+
+        segments, index, base_width, width_scale, thickness = (
+            np.concatenate(column) for column in zip(*strokes))
+
+        # Wide bundles would overshoot the nodes with projecting caps
+        capstyle = 'projecting' if np.all(thickness == 1) else 'butt'
+        self.edge_collection = LineCollection(segments, colors='k', alpha=0.3, linewidths=0.5,
+                                              capstyle=capstyle, zorder=1)
+        self.ax.add_collection(self.edge_collection, autolim=False)
+
+        # Individual edge weight pattern:
+        # unique frequency (between 0.8 and 2.0) and phase for each edge
+        self.edge_pulse_phase = index * 0.1
+        self.edge_freq = 0.8 + (index % 7) * 0.2
+        self.edge_phase = index * 0.3
+
+        self.edge_base_width = base_width
+        self.edge_width_scale = width_scale
+        self.edge_thickness = thickness
+
+    def edge_widths(self, index):
+        """Base line width and pulse amplitude of edges by their index"""
+        # Every 7th edge is a strong one, every 5th a medium one
+        base_width = np.where(index % 7 == 0, 0.5, np.where(index % 5 == 0, 0.3, 0.1))
+        width_scale = np.where(index % 7 == 0, 1.5, np.where(index % 5 == 0, 1.0, 0.6))
+        return base_width, width_scale
+
+    def connect_layers(self, sources, targets, offset):
+        """Strokes between two layers: segments, edge index, base width, width scale, thickness
+
+        Pairs with more than max_edges edges are bundled: both layers are split
+        into runs of neighboring nodes and every pair of runs is drawn as one
+        stroke. A stroke pulses like the edge between the middle nodes of its
+        runs, its widths are the mean of its edges, thickened by their count.
+        """
+        n, m = len(sources), len(targets)
+        index = offset + np.arange(n * m)
+        base_width, width_scale = self.edge_widths(index)
+
+        if self.max_edges is None or n * m <= self.max_edges:
+            segments = self.connection_endpoints(sources, targets, self.node_radius)
+            return segments, index, base_width, width_scale, np.ones(n * m)
+
+        # Runs are split in proportion to the layer sizes, so bundles stay about square
+        source_runs = min(n, self.max_edges, max(1, math.isqrt(self.max_edges * n // m)))
+        target_runs = min(m, max(1, self.max_edges // source_runs))
+        source_run = np.arange(n) * source_runs // n
+        target_run = np.arange(m) * target_runs // m
+        source_sizes = np.bincount(source_run)
+        target_sizes = np.bincount(target_run)
+
+        def centers(positions, run, sizes):
+            return np.column_stack([np.bincount(run, positions[:, axis]) / sizes for axis in (0, 1)])
+
+        segments = self.connection_endpoints(centers(sources, source_run, source_sizes),
+                                             centers(targets, target_run, target_sizes),
+                                             self.node_radius)
+
+        bundle = (source_run[:, None] * target_runs + target_run[None, :]).ravel()
+        count = np.bincount(bundle)
+        base_width = np.bincount(bundle, base_width) / count
+        width_scale = np.bincount(bundle, width_scale) / count
+
+        # Edge between the middle nodes of both runs
+        source_middle = np.cumsum(source_sizes) - source_sizes + source_sizes // 2
+        target_middle = np.cumsum(target_sizes) - target_sizes + target_sizes // 2
+        index = offset + (source_middle[:, None] * m + target_middle[None, :]).ravel()
+
+        # Overlapping edges do not add up, a bundle grows with the square root of its
+        # edge count and never gets wider than its runs
+        points_per_unit = 72 * min(self.ax.get_position().width, self.ax.get_position().height)
+        spread = ((source_sizes[:, None] + target_sizes[None, :]).ravel() / 2 - 1) * self.node_spacing()
+        spread = (spread + 2 * self.node_radius) * points_per_unit
+        thickness = np.clip(spread / (base_width + width_scale / 2), 1, np.sqrt(count))
+
+        return segments, index, base_width, width_scale, thickness
+
+    def connection_endpoints(self, sources, targets, radius):
+        """(len(sources) * len(targets), 2, 2) segments between all node pairs, stopping at node edges"""
+        start = np.broadcast_to(sources[:, None, :], (len(sources), len(targets), 2))
+        end = np.broadcast_to(targets[None, :, :], (len(sources), len(targets), 2))
+
+        direction = end - start
+        distance = np.hypot(direction[..., 0], direction[..., 1])[..., None]
+
+        # Coincident nodes keep both ends at the node center
+        offset = np.divide(direction * radius, distance, out=np.zeros_like(direction),
+                           where=distance > 0)
+
+        return np.stack([start + offset, end - offset], axis=2).reshape(-1, 2, 2)
+
+    def get_animated_colors(self, base_colors, time_offsets):
+        """Generate animated RGB colors for all nodes at once based on time"""
         # Create a wave pattern for each RGB component
-        r = (math.sin(self.time + time_offset) + 1) / 2
-        g = (math.sin(self.time + time_offset + 2) + 1) / 2
-        b = (math.sin(self.time + time_offset + 4) + 1) / 2
+        phases = self.time + time_offsets[:, None] + np.array([0, 2, 4])
+        rgb = (np.sin(phases) + 1) / 2
 
         # Blend with base color
-        base_r, base_g, base_b = base_color
-        final_r = (r + base_r) / 2
-        final_g = (g + base_g) / 2
-        final_b = (b + base_b) / 2
+        return (rgb + base_colors) / 2
+
+    def get_edge_attributes(self):
+        """Per-edge alpha and line width at the current time"""
+        # Pulsing alpha effect:
+        pulse = (np.sin(self.time * 2 + self.edge_pulse_phase) + 1) / 2
+        alpha = 0.1 + pulse * 0.4
+
+        weight_pulse = (np.sin(self.time * self.edge_freq + self.edge_phase) + 1) / 2
+
+        # Secondary wave for better optics (different frequency)
+        weight_pulse2 = (np.sin(self.time * (self.edge_freq * 0.6) + self.edge_phase * 1.3) + 1) / 2
 
-        return (final_r, final_g, final_b)
+        # Combine waves
+        combined_weight = (weight_pulse + weight_pulse2) / 2
+        line_width = (self.edge_base_width + combined_weight * self.edge_width_scale) * self.edge_thickness
+
+        return alpha, line_width
 
     def animate(self, frame):
         """Animation function called by matplotlib"""
         # time for one complete loop: 2π cycle
-        total_frames = 120  # frames per complete cycle
-        self.time = (frame % total_frames) * 2 * math.pi / total_frames
-
-        for i, circle in enumerate(self.input_circles):
-            color = self.get_animated_color(
-                (0.2, 0.4, 0.8), i * 0.5)  # Blue base
-            circle.set_color(color)
-
-        for i, circle in enumerate(self.hidden1_circles):
-            color = self.get_animated_color(
-                (0.2, 0.8, 0.4), i * 0.3)  # Green base
-            circle.set_color(color)
-
-        for i, circle in enumerate(self.hidden2_circles):
-            color = self.get_animated_color(
-                (1.0, 0.6, 0.2), i * 0.4)  # Orange base
-            circle.set_color(color)
-
-        for i, circle in enumerate(self.hidden3_circles):
-            color = self.get_animated_color(
-                (0.6, 0.2, 0.8), i * 0.5)  # Purple base
-            circle.set_color(color)
-
-        for i, circle in enumerate(self.hidden4_circles):
-            color = self.get_animated_color(
-                (0.2, 0.8, 0.8), i * 0.4)  # Cyan base
-            circle.set_color(color)
-
-        for i, circle in enumerate(self.hidden5_circles):
-            color = self.get_animated_color(
-                (0.8, 0.2, 0.6), i * 0.6)  # Magenta base
-            circle.set_color(color)
-
-        for i, circle in enumerate(self.output_circles):
-            color = self.get_animated_color(
-                (0.8, 0.4, 0.2), i * 0.7)  # Red base
-            circle.set_color(color)
-
-        for i, line in enumerate(self.connections):
-            # Pulsing alpha effect:
-            pulse = (math.sin(self.time * 2 + i * 0.1) + 1) / 2
-            alpha = 0.1 + pulse * 0.4
-
-            # Individual edge weight pattern:
-            # Create unique frequency and phase for each edge
-            # Vary frequency between 0.8 and 2.0
-            edge_freq = 0.8 + (i % 7) * 0.2
-            edge_phase = i * 0.3  # Unique phase offset for each edge
-
-            weight_pulse = (math.sin(self.time * edge_freq + edge_phase) + 1) / 2
-
-            # Secondary wave for better optics (different frequency)
-            weight_pulse2 = (math.sin(self.time * (edge_freq * 0.6) + edge_phase * 1.3) + 1) / 2
-
-            # Combine waves
-            combined_weight = (weight_pulse + weight_pulse2) / 2
-
-            if i % 7 == 0:
-                line_width = 0.5 + combined_weight * 1.5
-            elif i % 5 == 0:
-                line_width = 0.3 + combined_weight * 1.0
-            else:
-                line_width = 0.1 + combined_weight * 0.6
-
-            line.set_alpha(alpha)
-            line.set_linewidth(line_width)
-
-        return self.input_circles + self.hidden1_circles + self.hidden2_circles + \
-            self.hidden3_circles + self.hidden4_circles + self.hidden5_circles + \
-            self.output_circles + self.connections
+        self.time = (frame % self.total_frames) * 2 * math.pi / self.total_frames
+
+        self.node_collection.set_color(
+            self.get_animated_colors(self.node_base_colors, self.node_time_offsets))
+
+        alpha, line_width = self.get_edge_attributes()
+        self.edge_collection.set_alpha(alpha)
+        self.edge_collection.set_linewidths(line_width)
+
+        return [self.node_collection, self.edge_collection]
+
+    def render_frame(self, frame, keep=True):
+        """RGB raster of a frame, phases that are kept are only rendered once
+
+        Phases that are not asked for again should not be kept, copying them
+        into the cache would only grow the memory of a render.
+        """
+        phase = frame % self.total_frames
+        raster = self.frame_cache.get(phase)
+
+        if raster is None:
+            with self.metrics.phase("draw"):
+                self.animate(phase)
+            with self.metrics.phase("rasterize"):
+                self.fig.canvas.draw()
+                raster = np.asarray(self.fig.canvas.buffer_rgba())[..., :3]
+
+            # Phases that do not fit into the cache anymore are passed on uncached
+            stored = self.frame_cache.put(phase, raster) if keep else None
+            if stored is not None:
+                raster = stored
+
+        return raster
 
     def start_animation(self):
-        anim = animation.FuncAnimation(self.fig, self.animate, interval=50,
-                                       blit=False, frames=1000, repeat=True)
+        return self.preview()
+
+    def preview(self):
+        """Play the animation in a window, replaying cached rasters of the phases drawn before
+
+        A phase that is not cached yet is drawn by blitting its nodes and
+        edges onto the background, the composed frame is then cached as well.
+        """
         plt.tight_layout()
-        plt.show()
-        return anim
 
-    def save_as_gif(self, filename="neural_network_animation.gif"):
-        print(f"Saving animation as {filename}...")
+        # Rasters match the window, not the layout of rendered files
+        self.frame_cache.clear()
+        image = self.fig.figimage(np.zeros((1, 1, 3), dtype=np.uint8), origin='upper', zorder=20)
+
+        def draw_frame(frame, previous):
+            canvas = np.asarray(self.fig.canvas.buffer_rgba())
+            phase = frame % self.total_frames
+            raster = self.frame_cache.get(phase)
+
+            if raster is not None and raster.shape[:2] != canvas.shape[:2]:
+                # The window was resized, the cached rasters do not fit anymore
+                self.frame_cache.clear()
+                raster = None
+
+            if raster is not None:
+                image.set_data(raster)
+                return [image]
+
+            # Edges go below the nodes
+            for artist in sorted(self.animate(phase), key=lambda artist: artist.get_zorder()):
+                self.fig.draw_artist(artist)
+
+            self.frame_cache.put(phase, canvas[..., :3])
+            return []
+
+        return Preview(self.fig, draw_frame, self.total_frames, self.fps,
+                       artists=[self.node_collection, self.edge_collection, image]).play()
+
+    def parameters(self):
+        """Constructor arguments that rebuild this animation, e.g. in a worker process"""
+        return {"w": self.w, "h": self.h, "steps": self.steps, "dpi": self.dpi,
+                "frame_cache_mb": self.frame_cache_mb, "layers": self.layer_sizes,
+                "max_edges": self.max_edges}
+
+    def iter_frames(self, start=0, stop=None):
+        """Yield frames [start, stop) as RGB arrays, valid until the next frame"""
+        stop = self.total_frames if stop is None else stop
+
+        # Only phases that come around again before stop are cached
+        for frame in range(start, stop):
+            yield self.render_frame(frame, keep=frame + self.total_frames < stop)
+
+    def vector_scene(self, keyframes=VECTOR_KEYFRAMES):
+        """Nodes and edges as a looping VectorScene, their attributes sampled at keyframes per cycle"""
+        # Drawing applies the equal aspect ratio to the data transform
+        self.fig.canvas.draw()
+        width, height = self.fig.canvas.get_width_height()
+
+        def to_pixels(points):
+            pixels = self.ax.transData.transform(points.reshape(-1, 2)).reshape(points.shape)
+            pixels[..., 1] = height - pixels[..., 1]
+            return pixels
+
+        # Keyframes span the cycle up to its end, then playback restarts at phase 0 like the frames
+        opacity, line_width, fill = [], [], []
+        for phase in np.linspace(0, self.total_frames, keyframes + 1):
+            self.time = phase * 2 * math.pi / self.total_frames
+            alpha, widths = self.get_edge_attributes()
+            opacity.append(np.broadcast_to(alpha, widths.shape))
+            line_width.append(widths * self.fig.dpi / 72)
+            fill.append(self.get_animated_colors(self.node_base_colors, self.node_time_offsets))
+
+        scene = VectorScene(width, height, self.total_frames / self.fps, self.fps,
+                            self.fig.get_facecolor(), loop=True)
+        scene.set_lines(to_pixels(np.asarray(self.edge_collection.get_segments())), (0, 0, 0),
+                        np.stack(opacity, axis=1), np.stack(line_width, axis=1))
+
+        radius = to_pixels(np.array([[self.node_radius, 0], [0, 0]]))
+        scene.set_circles(to_pixels(np.asarray(self.node_collection.get_offsets())),
+                          radius[0, 0] - radius[1, 0], np.stack(fill, axis=1),
+                          self.node_collection.get_alpha())
+
+        return scene
+
+    def palette_sample(self, count=8):
+        """Frames spread over one cycle, the GIF palette of the whole loop is built from them"""
+        step = max(self.total_frames // count, 1)
+        return [np.array(self.render_frame(phase)) for phase in range(0, self.total_frames, step)]
+
+    def save_as_gif(self, filename="neural_network_animation.gif", workers=1, loops=1,
+                    queue_depth=0):
+        self.save([Output(filename)], workers, loops, queue_depth)
+
+    def save(self, outputs, workers=1, loops=1, queue_depth=0, start=0, stop=None):
+        """Render frames [start, stop) once and encode them to all outputs"""
+        print(f"Saving animation as {', '.join(map(str, outputs))}...")
         print("This may take a moment...")
 
-        anim = animation.FuncAnimation(self.fig, self.animate,
-                                       interval=100, blit=False,
-                                       frames=120, repeat=True)
+        if loops < 1:
+            raise ValueError(f"Expected loops of 1 or more, received: {loops}")
+
+        n_frames = self.total_frames * loops
+        stop = n_frames if stop is None else min(stop, n_frames)
 
-        # Save as GIF with endless loop
-        anim.save(Path(filename), writer='pillow', fps=12,
-                  savefig_kwargs={'facecolor': 'white', 'edgecolor': 'none'})
+        raster = save_vector_outputs(self, outputs)
+        if raster:
+            encode_frames(self, raster, workers, queue_depth, start, stop)
 
-        print(f"Animation saved as {filename}")
-        print("Perfect seamless loop created - animation ends exactly where it started!")
-        return anim
+        print(f"Animation saved as {', '.join(map(str, outputs))}")
+        if (start, stop) == (0, n_frames):
+            print("Perfect seamless loop created - animation ends exactly where it started!")
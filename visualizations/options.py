@@ -0,0 +1,77 @@
+# Choices and parsers of CLI options, kept free of heavy imports so argument parsing stays fast
+
+import argparse
+
+WAVE_BACKENDS = ("matplotlib", "incremental", "numpy")
+
+# Cyclic palettes, start and end of the color range meet at 0 = 2π
+PHASE_PALETTES = ("hls", "husl", "twilight", "twilight_shifted", "hsv")
+
+# Options of an output spec "path[:width=W][:height=H][:stride=N]"
+OUTPUT_OPTIONS = ("width", "height", "stride")
+
+
+def parse_output_spec(spec):
+    """(path, options) of an output spec, a ValueError names the invalid option"""
+    path, *options = spec.split(":")
+    values = {}
+
+    if not path:
+        raise ValueError(f"Missing the file path of output '{spec}'")
+
+    for option in options:
+        name, _, value = option.partition("=")
+        if name not in OUTPUT_OPTIONS or not value.isdigit() or int(value) < 1:
+            raise ValueError(f"Invalid output option '{option}' in '{spec}', "
+                             "expected width=W, height=H or stride=N with positive integers")
+        values[name] = int(value)
+
+    return path, values
+
+
+def parse_frames(spec):
+    """(start, stop) of a "START:END" frame slice, either bound may be left out"""
+    start, separator, stop = spec.partition(":")
+    if not separator:
+        raise ValueError(f"Expected a frame slice START:END, received: '{spec}'")
+
+    try:
+        start = int(start) if start else 0
+        stop = int(stop) if stop else None
+    except ValueError:
+        raise ValueError(f"Expected integer frames START:END, received: '{spec}'") from None
+
+    if start < 0 or (stop is not None and stop <= start):
+        raise ValueError(f"Expected 0 <= START < END, received: '{spec}'")
+
+    return start, stop
+
+
+def parse_layers(layers):
+    """Nodes per layer as a list, at least two layers with one node or more"""
+    if not isinstance(layers, (list, tuple)) or not all(
+            isinstance(size, int) and not isinstance(size, bool) for size in layers):
+        raise ValueError(f"Expected a list of integer layer sizes, received: {layers}")
+
+    if len(layers) < 2 or min(layers) < 1:
+        raise ValueError(f"Expected at least two layers with one node or more, received: {layers}")
+
+    return list(layers)
+
+
+def positive_int(value):
+    """argparse type of options that need a count of one or more"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, received: {value}")
+
+    return number
+
+
+def positive_float(value):
+    """argparse type of options that need a value above zero, e.g. rates and durations"""
+    number = float(value)
+    if not 0 < number < float("inf"):
+        raise argparse.ArgumentTypeError(f"expected a positive number, received: {value}")
+
+    return number
@@ -0,0 +1,99 @@
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+
+from visualizations.metrics import RenderMetrics
+from visualizations.writers import FanOutWriter, concat_files
+
+
+def split_frames(n_frames, workers):
+    """Split range(n_frames) into at most `workers` contiguous, non-empty chunks"""
+    bounds = [n_frames * i // workers for i in range(workers + 1)]
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def render_chunk(factory, kwargs, start, stop, outputs, paths, fps, queue_depth=0):
+    """Build the animation in this process and encode frames [start, stop) to the outputs at paths"""
+    animation = factory(**kwargs)
+
+    # Every chunk builds the same palette from the same samples
+    with FanOutWriter(outputs, fps, getattr(animation, "palette_sample", None), queue_depth,
+                      paths, start) as writer:
+        for frame in animation.iter_frames(start, stop):
+            writer.write(frame)
+
+    plt.close(animation.fig)
+    return paths
+
+
+def render_parallel(factory, kwargs, n_frames, outputs, fps, workers, metrics=None, queue_depth=0,
+                    first=0):
+    """Render frames [first, first + n_frames) in contiguous chunks and join the encoded chunks
+
+    Every frame has to be a pure function of its index, so that each worker
+    can rebuild the figure from `kwargs` and start at any frame. Each worker
+    encodes its chunk to every output, image sequences are numbered by frame
+    and written in place. Progress is reported to `metrics` whenever a chunk
+    is finished.
+    """
+    chunks = [(first + start, first + stop) for start, stop in split_frames(n_frames, workers)]
+    metrics = metrics if metrics is not None else RenderMetrics(progress=False)
+    chunk_paths = [[] for _ in outputs]
+
+    with tempfile.TemporaryDirectory(dir=outputs[0].path.parent) as directory:
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            futures = {}
+            for i, (start, stop) in enumerate(chunks):
+                # Outputs with a frame stride may not have any frame in a chunk
+                selected = [k for k, output in enumerate(outputs) if output.frames(start, stop)]
+                paths = []
+                for k in selected:
+                    path = outputs[k].path
+                    if not outputs[k].is_sequence():
+                        path = Path(directory) / f"chunk_{i:04d}_{k}{path.suffix}"
+                        chunk_paths[k].append(path)
+                    paths.append(path)
+
+                futures[pool.submit(render_chunk, factory, kwargs, start, stop,
+                                    [outputs[k] for k in selected], paths, fps,
+                                    queue_depth)] = stop - start
+
+            # Draw, rasterize and encode happen in the workers
+            with metrics.phase("render"):
+                for future in as_completed(futures):
+                    future.result()
+                    metrics.frames_done(futures[future])
+
+        with metrics.phase("concat"):
+            for output, paths in zip(outputs, chunk_paths):
+                if paths:
+                    concat_files(paths, output.path)
+
+
+def encode_frames(animation, outputs, workers=1, queue_depth=0, start=0, stop=None):
+    """Render frames [start, stop) of an animation once and encode them to all outputs
+
+    With more than one worker, chunks are rendered by processes that rebuild
+    the animation from its parameters(). Otherwise frames are streamed from
+    iter_frames, encoded on separate threads if queue_depth > 0.
+    """
+    if start >= stop:
+        raise ValueError(f"Frames {start}:{stop} are empty")
+
+    metrics = animation.metrics
+    metrics.start_frames(stop - start)
+
+    if workers > 1:
+        render_parallel(type(animation), animation.parameters(), stop - start, outputs,
+                        animation.fps, workers, metrics, queue_depth, start)
+        return
+
+    # Frame production is timed by the nested phases, the rest is encoding
+    with (metrics.phase("encode"),
+          FanOutWriter(outputs, animation.fps, getattr(animation, "palette_sample", None),
+                       queue_depth, start=start) as writer):
+        for frame in animation.iter_frames(start, stop):
+            writer.write(frame)
+            metrics.frames_done()
@@ -0,0 +1,67 @@
+import queue
+import threading
+
+import numpy as np
+
+
+class PipelinedWriter:
+    """Encode frames on a consumer thread while the caller renders the next ones
+
+    Frames are copied into `depth` reusable buffers. When all buffers wait
+    for the encoder, write blocks until one is free again, so memory stays
+    bounded by the queue depth.
+    """
+
+    def __init__(self, writer, depth=4):
+        self.writer = writer
+        self.depth = depth
+        self.free = queue.Queue()
+        self.filled = queue.Queue()
+        self.thread = None
+        self.error = None
+
+    def __enter__(self):
+        self.writer.__enter__()
+        return self
+
+    def write(self, frame):
+        if self.error is not None:
+            raise self.error
+
+        if self.thread is None:
+            # Buffers take the shape of the first frame
+            for _ in range(self.depth):
+                self.free.put(np.empty_like(frame))
+            self.thread = threading.Thread(target=self.consume, daemon=True)
+            self.thread.start()
+
+        buffer = self.free.get()
+        np.copyto(buffer, frame)
+        self.filled.put(buffer)
+
+    def consume(self):
+        while (buffer := self.filled.get()) is not None:
+            # After a failure the queue is still drained, so the producer never blocks
+            if self.error is None:
+                try:
+                    self.writer.write(buffer)
+                except Exception as e:
+                    self.error = e
+
+            self.free.put(buffer)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.thread is not None:
+            self.filled.put(None)
+            self.thread.join()
+
+        if self.error is not None and exc_type is None:
+            self.writer.__exit__(type(self.error), self.error, self.error.__traceback__)
+            raise self.error
+
+        return self.writer.__exit__(exc_type, exc, tb)
+
+
+def pipelined(writer, depth):
+    """Wrap writer in a PipelinedWriter, depth 0 keeps rendering and encoding in series"""
+    return PipelinedWriter(writer, depth) if depth > 0 else writer
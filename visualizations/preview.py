@@ -0,0 +1,99 @@
+import time
+
+import matplotlib.pyplot as plt
+
+
+class Preview:
+    """Interactive playback that only redraws the animated artists over a cached background
+
+    A timer always shows the frame that is due at the current wall-clock time,
+    frames that are late are skipped. `draw_frame(frame, previous)` updates the
+    animation and returns the artists to draw. With `accumulate`, drawn
+    artists become part of the background and only what changed since the
+    `previous` frame is returned; previous is None whenever the background
+    starts over, e.g. when the animation loops or the window is resized.
+    """
+
+    def __init__(self, fig, draw_frame, n_frames, fps, artists=(), accumulate=False):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.draw_frame = draw_frame
+        self.n_frames = n_frames
+        self.fps = fps
+        self.accumulate = accumulate
+        self.background = None
+        self.empty = None
+        self.previous = None
+        self.started = None
+        self.drawn = 0
+        self.skipped = 0
+        self.last_report = 0.0
+
+        # Animated artists are left out of full redraws, so the background stays clean
+        for artist in artists:
+            artist.set_animated(True)
+
+    def on_draw(self, event):
+        # Full redraws (first show, resize) refresh the cached background
+        self.empty = self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.previous = None
+
+    def tick(self):
+        if self.background is None:
+            return
+
+        now = time.perf_counter()
+        if self.started is None:
+            # The first report comes after a full second of playback
+            self.started = self.last_report = now
+
+        frame = int((now - self.started) * self.fps) % self.n_frames
+        if frame == self.previous:
+            return
+
+        previous = self.previous
+        if previous is not None:
+            self.skipped += (frame - previous - 1) % self.n_frames
+
+        if self.accumulate and previous is not None and frame < previous:
+            # Looping starts over from the figure without any animated artists
+            self.background = self.empty
+            previous = None
+
+        self.canvas.restore_region(self.background)
+        for artist in self.draw_frame(frame, previous):
+            self.fig.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+
+        if self.accumulate:
+            self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+        self.previous = frame
+        self.drawn += 1
+
+        if now - self.last_report >= 1.0:
+            self.last_report = now
+            self.report()
+
+    def achieved_fps(self):
+        if self.started is None or self.drawn == 0:
+            return 0.0
+
+        return self.drawn / (time.perf_counter() - self.started)
+
+    def report(self, end=""):
+        print(f"\rPreview: {self.achieved_fps():.1f} of {self.fps:.1f} frames/s, "
+              f"{self.skipped} frames skipped   ", end=end, flush=True)
+
+    def play(self):
+        """Show the window and play until it is closed"""
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.mpl_connect("close_event", lambda event: self.report(end="\n"))
+
+        # Ticking at twice the frame rate keeps the shown frame close to wall-clock time
+        timer = self.canvas.new_timer(interval=max(1, int(500 / self.fps)))
+        timer.add_callback(self.tick)
+        timer.start()
+
+        plt.show()
+        return self
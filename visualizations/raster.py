@@ -0,0 +1,51 @@
+import numpy as np
+
+
+class SegmentRasterizer:
+    """Composite round-capped line segments into a persistent uint8 RGB buffer"""
+
+    def __init__(self, background, linewidth, clip=None):
+        self.background = np.ascontiguousarray(background[..., :3], dtype=np.uint8)
+        self.buffer = self.background.copy()
+        self.radius = linewidth / 2
+        height, width = self.buffer.shape[:2]
+        self.clip = clip if clip is not None else (0, 0, width, height)
+
+    def reset(self):
+        np.copyto(self.buffer, self.background)
+
+    def draw(self, segments, colors):
+        """Paint segments (pixel coordinates, y pointing down) in order"""
+        for (start, end), color in zip(segments, colors):
+            self.draw_segment(start, end, color)
+
+    def draw_segment(self, start, end, color):
+        # Only touch the pixels in reach of the stroke
+        reach = self.radius + 1
+        x0 = max(int(min(start[0], end[0]) - reach), self.clip[0])
+        x1 = min(int(max(start[0], end[0]) + reach) + 1, self.clip[2])
+        y0 = max(int(min(start[1], end[1]) - reach), self.clip[1])
+        y1 = min(int(max(start[1], end[1]) + reach) + 1, self.clip[3])
+
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        # Distance of each pixel center to the segment
+        px = np.arange(x0, x1, dtype=np.float32) + 0.5 - start[0]
+        py = np.arange(y0, y1, dtype=np.float32)[:, None] + 0.5 - start[1]
+        dx = end[0] - start[0]
+        dy = end[1] - start[1]
+        length2 = dx * dx + dy * dy
+
+        if length2 > 0:
+            t = np.clip((px * dx + py * dy) / length2, 0, 1)
+            distance = np.hypot(px - t * dx, py - t * dy)
+        else:
+            distance = np.hypot(px, py)
+
+        # Antialiased coverage of the stroke, round caps come for free
+        coverage = np.clip(self.radius + 0.5 - distance, 0, 1)[..., None]
+
+        patch = self.buffer[y0:y1, x0:x1]
+        blended = patch + coverage * (np.asarray(color, dtype=np.float32) - patch)
+        patch[...] = (blended + 0.5).astype(np.uint8)
@@ -0,0 +1,89 @@
+from importlib import import_module
+
+# Entry point group of third-party visualizations, each entry point refers to a Visualization
+ENTRY_POINT_GROUP = "visualanimator.visualizations"
+
+
+def resolve(target):
+    """Import a "module:attribute" reference, callables are returned as they are"""
+    if callable(target):
+        return target
+
+    module, _, attribute = target.partition(":")
+    return getattr(import_module(module), attribute)
+
+
+class Visualization:
+    """CLI entry of a visualization, its implementation is only imported when it is rendered
+
+    `render(args, path, metrics)` renders the parsed CLI arguments to path and
+    returns the animation. `estimate_cost(args)` and `count_frames(args, animation)`
+    are used to schedule and report batch jobs. All three may be given as
+    "module:function" references to keep registration cheap. `modules` are
+    imported up front by long-lived worker processes.
+    """
+
+    def __init__(self, name, render, default_path, description="",
+                 estimate_cost=None, count_frames=None, modules=()):
+        self.name = name
+        self.render_target = render
+        self.default_path = default_path
+        self.description = description
+        self.estimate_cost_target = estimate_cost
+        self.count_frames_target = count_frames
+        self.modules = modules
+
+    def preload(self):
+        for module in self.modules:
+            import_module(module)
+
+    def render(self, args, path, metrics=None):
+        return resolve(self.render_target)(args, path, metrics)
+
+    def estimate_cost(self, args):
+        if self.estimate_cost_target is None:
+            return 0
+
+        return resolve(self.estimate_cost_target)(args)
+
+    def count_frames(self, args, animation):
+        if self.count_frames_target is None:
+            return len(getattr(animation, "frames", ()))
+
+        return resolve(self.count_frames_target)(args, animation)
+
+
+class Registry:
+    """Visualizations by CLI name, built-in ones first, then installed entry points"""
+
+    def __init__(self):
+        self.visualizations = {}
+        self.plugins = None
+
+    def register(self, visualization):
+        self.visualizations[visualization.name] = visualization
+        return visualization
+
+    def entry_points(self):
+        # Scanning the installed distributions is only done when a name is not built in
+        if self.plugins is None:
+            from importlib import metadata
+
+            self.plugins = {entry_point.name: entry_point
+                            for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP)}
+
+        return self.plugins
+
+    def get(self, name):
+        if name in self.visualizations:
+            return self.visualizations[name]
+
+        entry_point = self.entry_points().get(name)
+        if entry_point is None:
+            return None
+
+        return self.register(entry_point.load())
+
+    def names(self):
+        return [*self.visualizations, *(name for name in self.entry_points()
+                                        if name not in self.visualizations)]
@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+from visualizations.writers import concat_files
+
+# Every shard file is described by a JSON file next to it
+MANIFEST_SUFFIX = ".shard.json"
+
+
+def manifest_path(path):
+    path = Path(path)
+    return path.with_name(path.name + MANIFEST_SUFFIX)
+
+
+def write_manifest(path, **description):
+    """Describe the shard at path, e.g. its frames, frame rate and render parameters"""
+    with open(manifest_path(path), "w") as f:
+        json.dump({"shard": Path(path).name, **description}, f, indent=2, default=str)
+
+
+def read_manifest(path):
+    with open(manifest_path(path)) as f:
+        return json.load(f)
+
+
+def stitch(paths, output):
+    """Join shards of one render into output without re-encoding
+
+    Shards may be given in any order. They have to be rendered with the same
+    parameters and cover consecutive frames, otherwise a ValueError is raised.
+    Returns the (start, stop) frames and the total frames of the render.
+    """
+    shards = sorted(((read_manifest(path), path) for path in paths),
+                    key=lambda shard: shard[0]["frames"][0])
+    first = shards[0][0]
+
+    for manifest, path in shards:
+        for key in ("visualization", "parameters", "fps", "stride", "size", "total_frames"):
+            if manifest.get(key) != first.get(key):
+                raise ValueError(f"Shard '{path}' differs from '{shards[0][1]}' in '{key}'")
+
+    for (previous, previous_path), (manifest, path) in zip(shards, shards[1:]):
+        if manifest["frames"][0] != previous["frames"][1]:
+            raise ValueError(f"Shards '{previous_path}' (frames {previous['frames']}) and "
+                             f"'{path}' (frames {manifest['frames']}) are not consecutive")
+
+    concat_files([path for _, path in shards], output)
+
+    return (first["frames"][0], shards[-1][0]["frames"][1]), first["total_frames"]
@@ -0,0 +1,212 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+# Output extensions written by write_vector instead of a frame writer
+VECTOR_SUFFIXES = (".svg", ".json")
+
+
+def hex_color(rgb):
+    return "#" + "".join(f"{round(min(max(value, 0.0), 1.0) * 255):02x}" for value in rgb[:3])
+
+
+def format_points(points):
+    return " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+
+
+class VectorScene:
+    """Geometry of an animation, stored once, with keyframed or revealed attributes
+
+    Coordinates are pixels of the rendered frames with y pointing down.
+    Keyframes are spread evenly over `duration` seconds, a looping scene
+    repeats them forever. `reveal` is the (start, end) x of a clip edge
+    moving from left to right over the duration, it applies to paths added
+    with revealed=True.
+    """
+
+    def __init__(self, width, height, duration, fps, background, loop=False, reveal=None):
+        self.width = width
+        self.height = height
+        self.duration = duration
+        self.fps = fps
+        self.background = background
+        self.loop = loop
+        self.reveal = reveal
+        self.paths = []
+        self.lines = None
+        self.circles = None
+
+    def add_paths(self, polylines, color, width, opacity=1.0, revealed=False):
+        """Static stroked polylines, each a (points, 2) array"""
+        self.paths.append((polylines, color, width, opacity, revealed))
+
+    def set_lines(self, segments, color, opacity, width):
+        """(n, 2, 2) lines with (n, keyframes) opacities and widths"""
+        self.lines = (segments, color, opacity, width)
+
+    def set_circles(self, centers, radius, fill, opacity):
+        """(n, 2) circles with (n, keyframes, 3) fill colors"""
+        self.circles = (centers, radius, fill, opacity)
+
+
+def save_vector_outputs(animation, outputs):
+    """Write the vector outputs from animation.vector_scene(), return the other outputs"""
+    vector = [output for output in outputs if output.is_vector()]
+
+    if vector:
+        with animation.metrics.phase("vector"):
+            scene = animation.vector_scene()
+            for output in vector:
+                write_vector(scene, output)
+
+    return [output for output in outputs if not output.is_vector()]
+
+
+def write_vector(scene, output):
+    """Write the scene as animated SVG or, for ".json", as Lottie animation"""
+    if output.path.suffix.lower() == ".svg":
+        write_svg(scene, output)
+    else:
+        write_lottie(scene, output)
+
+
+def write_svg(scene, output):
+    """Animated SVG, attributes are animated with SMIL <animate> elements"""
+    width, height = output.size(scene.width, scene.height)
+    repeat = 'repeatCount="indefinite"' if scene.loop else 'fill="freeze"'
+    timing = f'dur="{scene.duration:.3f}s" {repeat}'
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'viewBox="0 0 {scene.width} {scene.height}">',
+             f'<rect width="100%" height="100%" fill="{hex_color(scene.background)}"/>']
+
+    if scene.reveal is not None:
+        start, end = scene.reveal
+        parts.append(f'<defs><clipPath id="reveal"><rect x="0" y="0" width="{start:.1f}" '
+                     f'height="{scene.height}"><animate attributeName="width" '
+                     f'from="{start:.1f}" to="{end:.1f}" {timing}/></rect></clipPath></defs>')
+
+    for polylines, color, stroke_width, opacity, revealed in scene.paths:
+        clip = ' clip-path="url(#reveal)"' if revealed and scene.reveal is not None else ""
+        d = " ".join(f"M{format_points(points)}" for points in polylines)
+        parts.append(f'<path d="{d}" fill="none" stroke="{hex_color(color)}" '
+                     f'stroke-width="{stroke_width:.2f}" stroke-opacity="{opacity:.3g}" '
+                     f'stroke-linecap="round" stroke-linejoin="round"{clip}/>')
+
+    if scene.lines is not None:
+        segments, color, opacity, line_width = scene.lines
+        parts.append(f'<g stroke="{hex_color(color)}" stroke-linecap="square">')
+        for (start, end), alphas, widths in zip(segments, opacity, line_width):
+            parts.append(
+                f'<line x1="{start[0]:.1f}" y1="{start[1]:.1f}" x2="{end[0]:.1f}" y2="{end[1]:.1f}">'
+                f'<animate attributeName="stroke-opacity" '
+                f'values="{";".join(f"{value:.3f}" for value in alphas)}" {timing}/>'
+                f'<animate attributeName="stroke-width" '
+                f'values="{";".join(f"{value:.2f}" for value in widths)}" {timing}/></line>')
+        parts.append("</g>")
+
+    if scene.circles is not None:
+        centers, radius, fill, opacity = scene.circles
+        parts.append(f'<g fill-opacity="{opacity:.3g}">')
+        for (x, y), colors in zip(centers, fill):
+            parts.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{radius:.2f}">'
+                         f'<animate attributeName="fill" '
+                         f'values="{";".join(hex_color(color) for color in colors)}" {timing}/>'
+                         f'</circle>')
+        parts.append("</g>")
+
+    parts.append("</svg>")
+    Path(output.path).write_text("\n".join(parts))
+
+
+def static(value):
+    return {"a": 0, "k": value}
+
+
+def animated(values, frames):
+    """Lottie property with linear keyframes spread evenly over the frames"""
+    times = np.linspace(0, frames, len(values))
+    return {"a": 1, "k": [{"t": round(float(t), 3), "s": value,
+                           "i": {"x": [1], "y": [1]}, "o": {"x": [0], "y": [0]}}
+                          for t, value in zip(times, values)]}
+
+
+def shape_path(points, closed=False):
+    points = np.round(np.asarray(points, dtype=float), 1).tolist()
+    zeros = [[0, 0]] * len(points)
+    return {"i": zeros, "o": zeros, "v": points, "c": closed}
+
+
+def rectangle(x0, y0, x1, y1):
+    return shape_path([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], closed=True)
+
+
+def group(name, items):
+    transform = {"ty": "tr", "p": static([0, 0]), "a": static([0, 0]), "s": static([100, 100]),
+                 "r": static(0), "o": static(100)}
+    return {"ty": "gr", "nm": name, "it": [*items, transform]}
+
+
+def stroke(color, opacity, width, cap=2):
+    # Line caps: 1 butt, 2 round, 3 square
+    return {"ty": "st", "c": static([*map(float, color[:3]), 1]), "o": opacity, "w": width,
+            "lc": cap, "lj": 2}
+
+
+def write_lottie(scene, output):
+    """Lottie animation, the first layer is drawn on top"""
+    width, height = output.size(scene.width, scene.height)
+    frames = max(1, round(scene.duration * scene.fps))
+    scale = [100 * width / scene.width, 100 * height / scene.height, 100]
+    layers = []
+
+    def add_layer(name, shapes, masks=None):
+        layer = {"ddd": 0, "ind": len(layers) + 1, "ty": 4, "nm": name, "sr": 1,
+                 "ks": {"o": static(100), "r": static(0), "p": static([0, 0, 0]),
+                        "a": static([0, 0, 0]), "s": static(scale)},
+                 "ao": 0, "shapes": shapes, "ip": 0, "op": frames, "st": 0, "bm": 0}
+        if masks:
+            layer["hasMask"] = True
+            layer["masksProperties"] = masks
+        layers.insert(0, layer)
+
+    add_layer("Background", [group("Background", [
+        {"ty": "sh", "ks": static(rectangle(0, 0, scene.width, scene.height))},
+        {"ty": "fl", "c": static([*map(float, scene.background[:3]), 1]), "o": static(100),
+         "r": 1}])])
+
+    for index, (polylines, color, stroke_width, opacity, revealed) in enumerate(scene.paths):
+        masks = None
+        if revealed and scene.reveal is not None:
+            start, end = scene.reveal
+            masks = [{"inv": False, "mode": "a", "o": static(100), "x": static(0), "nm": "Reveal",
+                      "pt": animated([[rectangle(0, 0, start, scene.height)],
+                                      [rectangle(0, 0, end, scene.height)]], frames)}]
+
+        shapes = [{"ty": "sh", "ks": static(shape_path(points))} for points in polylines]
+        add_layer(f"Path {index}", [group(f"Path {index}", [
+            *shapes, stroke(color, static(100 * opacity), static(stroke_width))])], masks)
+
+    if scene.lines is not None:
+        segments, color, opacity, line_width = scene.lines
+        add_layer("Lines", [group(f"Line {index}", [
+            {"ty": "sh", "ks": static(shape_path(segment))},
+            stroke(color, animated([[value] for value in np.round(100 * alphas, 1).tolist()], frames),
+                   animated([[value] for value in np.round(widths, 2).tolist()], frames), cap=3)])
+            for index, (segment, alphas, widths) in enumerate(zip(segments, opacity, line_width))])
+
+    if scene.circles is not None:
+        centers, radius, fill, opacity = scene.circles
+        add_layer("Circles", [group(f"Circle {index}", [
+            {"ty": "el", "p": static(np.round(center, 1).tolist()),
+             "s": static([round(2 * radius, 2)] * 2)},
+            {"ty": "fl", "c": animated([[*color, 1] for color in np.round(colors, 3).tolist()], frames),
+             "o": static(100 * opacity), "r": 1}])
+            for index, (center, colors) in enumerate(zip(centers, fill))])
+
+    animation = {"v": "5.7.0", "fr": scene.fps, "ip": 0, "op": frames, "w": width, "h": height,
+                 "nm": Path(output.path).stem, "ddd": 0, "assets": [], "layers": layers}
+
+    with open(output.path, "w") as f:
+        json.dump(animation, f, separators=(",", ":"))
@@ -1,42 +1,339 @@
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 import numpy as np
-import seaborn as sns
 from matplotlib.animation import FuncAnimation
 from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
 from scipy.interpolate import interp1d
 
+from visualizations.colors import phase_indices, phase_lut, phase_palette
+from visualizations.lod import decimate, frame_error, polylines_to_segments
+from visualizations.metrics import RenderMetrics
+from visualizations.options import WAVE_BACKENDS
+from visualizations.parallel import encode_frames
+from visualizations.preview import Preview
+from visualizations.raster import SegmentRasterizer
+from visualizations.vector import VectorScene, save_vector_outputs
+from visualizations.writers import Output
+
 
 class WaveAnimation:
-    def __init__(self, steps=5000, start=0, end=5):
+    backends = WAVE_BACKENDS
+
+    def __init__(self, steps=5000, start=0, end=5, backend="matplotlib",
+                 figsize=(20, 4), dpi=300, duration=None, fps=None, seed=322,
+                 chunk_size=65536, lod=False, lod_pixels=1.0, palette="hls",
+                 color_resolution=256, metrics=None):
+        if backend not in self.backends:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {self.backends}")
+
+        for name, value in (("duration", duration), ("fps", fps)):
+            if value is not None and not value > 0:
+                raise ValueError(f"Expected a {name} above 0, received: {value}")
+
+        if chunk_size < 1:
+            raise ValueError(f"Expected a chunk size of 1 or more, received: {chunk_size}")
+
         self.frame_downsampling = 1
+        self.duration = duration
+        self.fps = fps if fps is not None else 1000 / 30
+        self.interval = 1000 / self.fps
+        self.linewidth = 6
         self.animation = None
+        self.backend = backend
+        self.figsize = figsize
+        self.dpi = dpi
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.lod = lod
+        self.lod_pixels = lod_pixels
+        self.palette = palette
+        self.color_resolution = color_resolution
+        self.metrics = metrics if metrics is not None else RenderMetrics(progress=False)
         self.steps = steps
         self.t_start = start
         self.t_end = end
-        self.time = np.linspace(self.t_start, self.t_end, self.steps)
-        self.animation = self.create_animation()
+        self.frames = self.schedule_frames(self.steps - 1)
+
+        if self.backend == "matplotlib":
+            self.time = np.linspace(self.t_start, self.t_end, self.steps)
+            self.create_line_collection()
+        else:
+            # Persistent-canvas backends stream the segments chunk by chunk
+            # and only need the empty axes up front
+            self.fig, self.ax = self.setup_time_axes(self.t_start, self.t_end)
+
+    def create_line_collection(self):
+        """Figure with every segment of the wave, frames reveal them by their alpha"""
+        self.fig, self.ax = self.setup_time_axes(self.t_start, self.t_end)
+
+        with self.metrics.phase("data"):
+            wave, phase = self.generate_wave()
+
+        if self.lod:
+            with self.metrics.phase("data"):
+                segments, colors, self.segment_starts = self.decimate_segments(self.time, wave, phase)
+            self.line_collection = self.plot_segments_axis(
+                self.ax, segments, self.color_table()[colors], linewidths=self.stroke_width(lod=True))
+        else:
+            self.segment_starts = np.arange(self.steps - 1)
+            self.line_collection = self.plot_line_collection_axis(
+                self.ax, self.time, wave, self.angle_2_color(phase[:-1]), linewidths=self.linewidth
+            )
 
     def create_animation(self):
-        fig, ax = self.setup_time_axes(self.t_start, self.t_end)
+        # Only built when played, an unused FuncAnimation warns when it is deleted
+        if self.animation is None:
+            self.animation = self.animate_line_collections(
+                [self.line_collection], self.fig, ax=self.ax)
 
-        wave, phase = self.generate_wave()
+        return self.animation
 
-        line_collection = self.plot_line_collection_axis(
-            ax, self.time, wave, self.angle_2_color(phase[:-1]), linewidths=6
-        )
-        return self.animate_line_collections(
-            [line_collection], fig, ax=ax)
+    def parameters(self):
+        """Constructor arguments that rebuild this animation, e.g. in a worker process"""
+        return {
+            "steps": self.steps,
+            "start": self.t_start,
+            "end": self.t_end,
+            "backend": self.backend,
+            "figsize": self.figsize,
+            "dpi": self.dpi,
+            "duration": self.duration,
+            "fps": self.fps,
+            "seed": self.seed,
+            "chunk_size": self.chunk_size,
+            "lod": self.lod,
+            "lod_pixels": self.lod_pixels,
+            "palette": self.palette,
+            "color_resolution": self.color_resolution,
+        }
+
+    def schedule_frames(self, n_segments):
+        """Number of revealed segments in every video frame"""
+        if self.duration is None:
+            return range(1, n_segments + 1, self.frame_downsampling)
+
+        # Curve resolution and video length are independent: each frame
+        # reveals as many segments as needed to fill the requested duration
+        n_frames = max(1, round(self.duration * self.fps))
+        return np.linspace(1, n_segments, n_frames).round().astype(int)
+
+    def save_as(self, path, workers=1, queue_depth=0):
+        if (workers <= 1 and self.backend == "matplotlib" and queue_depth == 0
+                and Path(path).suffix.lower() == ".mp4"):
+            # matplotlib's ffmpeg writer rasterizes and encodes each frame in one step,
+            # other formats use the project's writers
+            self.metrics.start_frames(len(self.frames))
+            with self.metrics.phase("encode"):
+                self.create_animation().save(path, progress_callback=lambda *_: self.metrics.frames_done())
+            return self.animation
+
+        return self.save([Output(path)], workers, queue_depth)
+
+    def save(self, outputs, workers=1, queue_depth=0, start=0, stop=None):
+        """Render frames [start, stop) once and encode them to all outputs"""
+        outputs = save_vector_outputs(self, outputs)
+        if not outputs:
+            return self.animation
+
+        stop = len(self.frames) if stop is None else min(stop, len(self.frames))
+        encode_frames(self, outputs, workers, queue_depth, start, stop)
 
-    def save_as(self, path):
-        self.animation.save(path)
         return self.animation
 
-    def generate_wave(self):
-        generator = np.random.default_rng(seed=322)
+    def vector_scene(self):
+        """Grid and wave as a VectorScene, the wave is revealed from left to right like the frames"""
+        self.fig.canvas.draw()
+        width, height = self.fig.canvas.get_width_height()
+        stroke_width = self.stroke_width() * self.dpi / 72
+
+        # The first segment is revealed in the first frame, the last one in the last frame
+        step = (self.t_end - self.t_start) / (self.steps - 1)
+        edges = self.segments_to_pixels(np.array([[self.t_start + self.frames[0] * step, 0],
+                                                  [self.t_start + self.frames[-1] * step, 0]]))
+        scene = VectorScene(width, height, max(len(self.frames) - 1, 1) / self.fps, self.fps,
+                            self.fig.get_facecolor(),
+                            reveal=tuple(edges[:, 0] + stroke_width / 2))
+
+        # Gridlines of ticks outside of the view are not drawn
+        x0, y0, x1, y1 = self.ax.bbox.extents
+        for line in self.ax.get_xgridlines() + self.ax.get_ygridlines():
+            pixels = line.get_transform().transform(line.get_xydata())
+            inside = ((pixels[:, 0] > x0 - 1) & (pixels[:, 0] < x1 + 1)
+                      & (pixels[:, 1] > y0 - 1) & (pixels[:, 1] < y1 + 1))
+
+            if line.get_visible() and inside.all():
+                pixels[:, 1] = height - pixels[:, 1]
+                alpha = line.get_alpha()
+                scene.add_paths([pixels], to_rgba(line.get_color()),
+                                line.get_linewidth() * self.dpi / 72, 1.0 if alpha is None else alpha)
+
+        # Consecutive segments of one color become one polyline, each color one path
+        table = self.color_table()
+        polylines = {}
+        for segments, colors, _ in self.iter_segment_chunks():
+            pixels = self.segments_to_pixels(segments)
+            changes = np.flatnonzero(np.diff(colors)) + 1
+            for begin, end in zip([0, *changes], [*changes, len(pixels)]):
+                points = np.concatenate([pixels[begin:end, :-1].reshape(-1, 2), pixels[end - 1, -1:]])
+                polylines.setdefault(int(colors[begin]), []).append(points)
+
+        for color, lines in sorted(polylines.items()):
+            scene.add_paths(lines, table[color], stroke_width, revealed=True)
+
+        return scene
+
+    def palette_sample(self):
+        """The fully revealed wave, it holds every color of the animation"""
+        return [np.array(frame) for frame in self.iter_frames(len(self.frames) - 1)]
+
+    def preview(self):
+        """Play the wave in a window, only drawing the newly revealed segments of each frame"""
+        # A fresh figure without the segments (and FuncAnimation) of the matplotlib backend
+        if self.backend == "matplotlib":
+            plt.close(self.fig)
+            self.fig, self.ax = self.setup_time_axes(self.t_start, self.t_end)
+
+        table = self.color_table()
+        reveals = None
+
+        def draw_frame(frame, previous):
+            nonlocal reveals
+            if previous is None:
+                reveals, previous = self.iter_reveals(), -1
+
+            artists = []
+            for _ in range(frame - previous):
+                for segments, colors in next(reveals):
+                    line_collection = LineCollection(segments, linewidths=self.stroke_width(),
+                                                     colors=table[colors], capstyle="round",
+                                                     transform=self.ax.transData)
+                    line_collection.set_clip_box(self.ax.bbox)
+                    artists.append(line_collection)
+
+            return artists
+
+        return Preview(self.fig, draw_frame, len(self.frames), self.fps, accumulate=True).play()
+
+    def iter_frames(self, start=0, stop=None):
+        """Yield frames [start, stop) as RGB(A) arrays, valid until the next frame"""
+        if self.backend == "incremental":
+            return self.iter_incremental_frames(start, stop)
+        elif self.backend == "numpy":
+            return self.iter_raster_frames(start, stop)
+
+        return self.iter_figure_frames(start, stop)
+
+    def iter_figure_frames(self, start=0, stop=None):
+        """Yield RGBA frames by redrawing the whole figure, like the FuncAnimation does"""
+        for revealed in self.frames[start:stop]:
+            with self.metrics.phase("draw"):
+                self.line_collection.set_alpha(self.segment_starts < revealed)
+            with self.metrics.phase("rasterize"):
+                self.fig.canvas.draw()
+
+            yield np.asarray(self.fig.canvas.buffer_rgba())
+
+    def iter_reveals(self, start=0, stop=None):
+        """Yield per frame the (segments, color indices) pieces revealed since the previous frame
+
+        The first frame gets everything revealed up to frame `start`, so a
+        persistent canvas can begin at any frame. Segments are pulled from
+        iter_segment_chunks, so only one chunk is held in memory.
+        """
+        chunks = self.iter_segment_chunks()
+        segments = colors = starts = np.empty((0,))
+        position = 0
+
+        for revealed in self.frames[start:stop]:
+            pieces = []
+
+            while True:
+                if position == len(segments):
+                    segments, colors, starts = next(chunks, (None, None, None))
+                    position = 0
+                    if segments is None:
+                        segments = colors = starts = np.empty((0,))
+                        break
+
+                # A (merged) segment is revealed together with its first original segment
+                end = np.searchsorted(starts, revealed)
+                if end > position:
+                    pieces.append((segments[position:end], colors[position:end]))
+                    position = end
+
+                if position < len(segments):
+                    break
+
+            yield pieces
+
+    def iter_incremental_frames(self, start=0, stop=None):
+        """Yield RGBA frames, letting Agg stroke only newly revealed segments onto the canvas"""
+        # Background, axes and grid are drawn once and stay on the canvas
+        with self.metrics.phase("setup"):
+            self.fig.canvas.draw()
+        renderer = self.fig.canvas.get_renderer()
+        canvas = np.asarray(self.fig.canvas.buffer_rgba())
+        table = self.color_table()
+
+        for pieces in self.iter_reveals(start, stop):
+            for segments, colors in pieces:
+                with self.metrics.phase("draw"):
+                    line_collection = LineCollection(segments, linewidths=self.stroke_width(),
+                                                     colors=table[colors], capstyle="round",
+                                                     transform=self.ax.transData)
+                    line_collection.set_clip_box(self.ax.bbox)
+                with self.metrics.phase("rasterize"):
+                    line_collection.draw(renderer)
+
+            yield canvas
+
+    def iter_raster_frames(self, start=0, stop=None):
+        """Yield RGB frames, compositing only newly revealed segments onto one buffer"""
+        with self.metrics.phase("setup"):
+            rasterizer = self.create_rasterizer()
+        lut = phase_lut(self.palette, self.color_resolution)[:, :3]
+
+        for pieces in self.iter_reveals(start, stop):
+            for segments, colors in pieces:
+                with self.metrics.phase("draw"):
+                    if segments.shape[1] > 2:
+                        segments, colors = polylines_to_segments(segments, colors)
+                    pixels = self.segments_to_pixels(segments)
+
+                with self.metrics.phase("rasterize"):
+                    rasterizer.draw(pixels, lut[colors])
+
+            yield rasterizer.buffer
+
+    def create_rasterizer(self):
+        # Let Agg draw the static background (grid, axes) exactly once
+        self.fig.canvas.draw()
+        background = np.asarray(self.fig.canvas.buffer_rgba())
+        height = background.shape[0]
+
+        x0, y0, x1, y1 = self.ax.bbox.extents
+        clip = (int(x0), int(height - y1), int(np.ceil(x1)), int(np.ceil(height - y0)))
+
+        return SegmentRasterizer(background, self.stroke_width() * self.dpi / 72, clip)
+
+    def segments_to_pixels(self, segments):
+        height = self.fig.canvas.get_width_height()[1]
+        pixels = self.ax.transData.transform(segments.reshape(-1, 2)).reshape(segments.shape)
+        pixels[..., 1] = height - pixels[..., 1]
+
+        return pixels
+
+    def frequency_interpolation(self):
+        generator = np.random.default_rng(seed=self.seed)
         x_samples = np.linspace(self.t_start, self.t_end, 10)
         f_samples = generator.random(x_samples.shape) * 6
-        interpolation = interp1d(x_samples, f_samples, kind="quadratic")
-        freq = interpolation(self.time)
+
+        return interp1d(x_samples, f_samples, kind="quadratic")
+
+    def generate_wave(self):
+        freq = self.frequency_interpolation()(self.time)
 
         return self.get_wave(self.time, freq)
 
@@ -46,8 +343,135 @@ class WaveAnimation:
 
         return np.sin(phases), ((phases + np.pi) % (2 * np.pi) - np.pi)
 
+    def iter_wave_chunks(self):
+        """Yield (time, freq, wave, phase) for consecutive chunks of samples
+
+        Values are bit-identical to generate_wave: time uses the same formula
+        as np.linspace and the running phase sum is carried across chunk
+        boundaries, while only one chunk is in memory at a time.
+        """
+        interpolation = self.frequency_interpolation()
+        step = (self.t_end - self.t_start) / (self.steps - 1)
+        dt = (1.0 * step + self.t_start) - (0.0 * step + self.t_start)
+        phase_sum = 0.0
+
+        for begin in range(0, self.steps, self.chunk_size):
+            with self.metrics.phase("data"):
+                end = min(begin + self.chunk_size, self.steps)
+                t = np.arange(begin, end, dtype=float) * step + self.t_start
+                if end == self.steps:
+                    t[-1] = self.t_end
+
+                freq = interpolation(t)
+                phases = np.cumsum(np.concatenate(([phase_sum], freq * 2 * np.pi * dt)))[1:]
+                phase_sum = phases[-1]
+                wave = np.sin(phases)
+                phase = (phases + np.pi) % (2 * np.pi) - np.pi
+
+            yield t, freq, wave, phase
+
+    def iter_segment_chunks(self, lod=None):
+        """Yield (segments, color indices, starts) chunk by chunk, matching make_segments
+
+        Colors are indices into color_table, matching angle_2_color. `starts`
+        is the index of the first original segment of each yielded (with LOD
+        possibly merged) segment.
+        """
+        lod = self.lod if lod is None else lod
+        previous = None
+        offset = 0
+
+        for t, _, wave, phase in self.iter_wave_chunks():
+            if previous is not None:
+                # The first segment of a chunk starts at the last sample of the previous one
+                t, wave, phase = (np.concatenate(([last], values))
+                                  for last, values in zip(previous, (t, wave, phase)))
+
+            previous = (t[-1], wave[-1], phase[-1])
+
+            if len(t) < 2:
+                continue
+
+            with self.metrics.phase("data"):
+                if lod:
+                    segments, colors, starts = self.decimate_segments(t, wave, phase)
+                    starts += offset
+                else:
+                    segments = self.make_segments(t, wave)
+                    colors = self.angle_2_index(phase[:-1])
+                    starts = np.arange(offset, offset + len(t) - 1)
+
+            yield segments, colors, starts
+            offset += len(t) - 1
+
+    def decimate_segments(self, t, wave, phase):
+        """Level of detail: merge segments within one pixel column and color bucket
+
+        Columns follow the actual figure size and dpi, so the number of drawn
+        segments is bounded by the output resolution instead of the sample count.
+        """
+        points = np.column_stack([t, wave])
+        pixels = self.ax.transData.transform(points[:-1])[:, 0]
+        columns = np.floor(pixels / self.lod_pixels).astype(np.int64)
+
+        # Buckets are the entries of the phase color table, merged segments
+        # therefore keep their exact color
+        buckets = self.angle_2_index(phase[:-1])
+
+        polylines, starts = decimate(points, columns, buckets)
+
+        return polylines, buckets[starts], starts
+
+    def stroke_width(self, lod=None):
+        """Line width in points of the drawn segments
+
+        Where many unmerged segments share a pixel column, their antialiased
+        edges add up to an almost hard edge. Merged LOD strokes of such dense
+        curves get half a pixel extra width to match that.
+        """
+        lod = self.lod if lod is None else lod
+        segments_per_column = (self.steps - 1) * self.lod_pixels / self.ax.bbox.width
+
+        if lod and segments_per_column > 2:
+            return self.linewidth + 36 / self.dpi
+
+        return self.linewidth
+
+    def render_final_frame(self, lod):
+        """RGB raster of the fully revealed wave, drawn chunk by chunk onto the empty axes"""
+        visible = [artist.get_visible() for artist in self.ax.collections]
+        for artist in self.ax.collections:
+            artist.set_visible(False)
+
+        self.fig.canvas.draw()
+        renderer = self.fig.canvas.get_renderer()
+        table = self.color_table()
+        drawn = 0
+
+        for segments, colors, _ in self.iter_segment_chunks(lod):
+            line_collection = LineCollection(segments, linewidths=self.stroke_width(lod),
+                                             colors=table[colors],
+                                             capstyle="round", transform=self.ax.transData)
+            line_collection.set_clip_box(self.ax.bbox)
+            line_collection.draw(renderer)
+            drawn += len(segments)
+
+        frame = np.asarray(self.fig.canvas.buffer_rgba())[..., :3].copy()
+
+        for artist, was_visible in zip(self.ax.collections, visible):
+            artist.set_visible(was_visible)
+
+        return frame, drawn
+
+    def lod_report(self):
+        """Segments drawn with and without LOD and the pixel error of the final frame"""
+        reference, segments = self.render_final_frame(lod=False)
+        frame, drawn = self.render_final_frame(lod=True)
+
+        return {"segments": segments, "drawn": drawn, **frame_error(reference, frame)}
+
     def setup_time_axes(self, start, end):
-        fig, ax = plt.subplots(1, 1, figsize=(20, 4), dpi=300)
+        fig, ax = plt.subplots(1, 1, figsize=self.figsize, dpi=self.dpi)
         fig.set_facecolor("black")
         ax.set_facecolor("black")
         ax.set_xlim(start - 0.1, end + 0.1)
@@ -58,7 +482,11 @@ class WaveAnimation:
 
     def plot_line_collection_axis(self, ax, x, y,
                                   color="white", alpha=1, **kwargs):
-        line_collection = LineCollection(self.make_segments(x, y), **kwargs)
+        return self.plot_segments_axis(ax, self.make_segments(x, y), color, alpha, **kwargs)
+
+    def plot_segments_axis(self, ax, segments,
+                           color="white", alpha=1, **kwargs):
+        line_collection = LineCollection(segments, **kwargs)
         line_collection.set_colors(color)
         line_collection.set_alpha(alpha)
         line_collection.set_capstyle("round")
@@ -73,16 +501,17 @@ class WaveAnimation:
 
         if ax is not None:
             for lc in line_collections:
-                segs = lc.get_segments()
-                x.append(np.array([seg[0, 0] for seg in segs]))
-                x.append(np.array([seg[0, 1] for seg in segs]))
+                segs = np.asarray(lc.get_segments())
+                x.append(segs[:, 0, 0])
+                x.append(segs[:, 0, 1])
 
             def animate(play_time):
-                for k, lc in enumerate(line_collections):
-                    lc.set_alpha(x[k] <= play_time)
+                with self.metrics.phase("draw"):
+                    for k, lc in enumerate(line_collections):
+                        lc.set_alpha(x[k] <= play_time)
 
                 if fills is None:
-                    return (line_collections,)
+                    return line_collections
 
                 mask_condition = x[0] >= play_time
                 x_masked = np.ma.masked_where(mask_condition, x[0])
@@ -101,18 +530,25 @@ class WaveAnimation:
                 if not only_fills:
                     ax.add_collection(lc)
 
-                return (line_collections, fills)
+                return [*line_collections, *fills]
 
+        # Reveal thresholds: start time of the last segment revealed in each frame
         return FuncAnimation(
             fig,
             animate,
-            frames=x[0][::self.frame_downsampling],
-            interval=30
+            frames=self.time[np.asarray(self.frames) - 1],
+            interval=self.interval
         )
 
+    def color_table(self):
+        return phase_palette(self.palette, self.color_resolution)
+
+    def angle_2_index(self, angle):
+        return phase_indices(angle, self.color_resolution)
+
     def angle_2_color(self, angle):
-        phase_colormap = sns.color_palette("hls", as_cmap=True)
-        return phase_colormap((angle % (2 * np.pi)) / (2 * np.pi))
+        # Single gather from the per-process phase color table
+        return self.color_table()[self.angle_2_index(angle)]
 
     def make_segments(self, x, y):
         points = np.array([x, y]).T.reshape(-1, 1, 2)
@@ -0,0 +1,180 @@
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from visualizations.ffmpeg import FFmpegWriter, concat_videos
+from visualizations.gif import GifWriter, concat_gifs
+from visualizations.options import parse_output_spec
+from visualizations.pipeline import pipelined
+from visualizations.vector import VECTOR_SUFFIXES
+
+# Video codecs by file extension, everything else uses matplotlib's default codec
+CODECS = {".webm": "libvpx-vp9"}
+
+
+def open_writer(path, fps, palette_source=None, first=0):
+    """Pick a frame writer from the file extension
+
+    `palette_source` returns sample frames for writers with a fixed palette.
+    A ".png" path writes an image sequence, numbered from `first` where the
+    path has no "%d" style pattern of its own.
+    """
+    suffix = Path(path).suffix.lower()
+
+    if suffix == ".gif":
+        return GifWriter(path, fps, palette_source)
+    if suffix == ".png":
+        return FFmpegWriter(sequence_pattern(path), fps, "png", ["-start_number", str(first)])
+
+    return FFmpegWriter(path, fps, CODECS.get(suffix))
+
+
+def sequence_pattern(path):
+    """ffmpeg file name pattern of an image sequence, "frames.png" becomes "frames_%05d.png" """
+    path = Path(path)
+    if "%" in path.name:
+        return path
+
+    return path.with_name(f"{path.stem}_%05d{path.suffix}")
+
+
+def concat_files(paths, output):
+    """Join chunks written by open_writer without re-encoding"""
+    if Path(output).suffix.lower() == ".gif":
+        concat_gifs(paths, output)
+    else:
+        concat_videos(paths, output)
+
+
+class Output:
+    """One encoded file of a render: path, frame size and frame stride
+
+    Only every `stride`-th frame is written, at fps / stride, so the output
+    keeps the duration of the render. Without width and height frames keep
+    the rendered size, with only one of them the aspect ratio is kept.
+    """
+
+    def __init__(self, path, width=None, height=None, stride=1):
+        if stride < 1:
+            raise ValueError(f"Expected a frame stride of 1 or more, received: {stride}")
+
+        self.path = Path(path)
+        self.width = width
+        self.height = height
+        self.stride = stride
+
+    @classmethod
+    def parse(cls, spec):
+        """Output from "path[:width=W][:height=H][:stride=N]" """
+        path, values = parse_output_spec(spec)
+        return cls(path, **values)
+
+    def is_sequence(self):
+        return self.path.suffix.lower() == ".png"
+
+    def is_vector(self):
+        """Vector outputs are written from the geometry of the animation instead of frames"""
+        return self.path.suffix.lower() in VECTOR_SUFFIXES
+
+    def size(self, width, height):
+        """Output size of frames rendered at width x height, even for the video encoders"""
+        if self.width is None and self.height is None:
+            return width, height
+
+        scale = self.width / width if self.width is not None else self.height / height
+        size = (self.width or width * scale, self.height or height * scale)
+
+        return tuple(max(2, round(value / 2) * 2) for value in size)
+
+    def frames(self, start, stop):
+        """Indices of the frames in [start, stop) that are written to this output"""
+        return range(-(-start // self.stride) * self.stride, stop, self.stride)
+
+    def open(self, fps, palette_source=None, path=None, start=0):
+        """Frame writer of this output, resizing frames on their way to the encoder
+
+        `path` replaces the output path, e.g. for chunks of a parallel render
+        that starts at frame `start`.
+        """
+        path = self.path if path is None else path
+        first = len(range(0, start, self.stride))
+
+        if palette_source is not None and (self.width or self.height):
+            unscaled = palette_source
+
+            def palette_source():
+                return [self.resize(frame) for frame in unscaled()]
+
+        return ResizingWriter(open_writer(path, fps / self.stride, palette_source, first), self)
+
+    def resize(self, frame):
+        size = self.size(frame.shape[1], frame.shape[0])
+        if size == (frame.shape[1], frame.shape[0]):
+            return frame
+
+        # Pillow releases the GIL while resampling, so outputs resize in parallel
+        image = Image.fromarray(np.ascontiguousarray(frame))
+        return np.asarray(image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0))
+
+    def __str__(self):
+        return str(self.path)
+
+
+class ResizingWriter:
+    """Resize frames to the size of an Output before passing them to its writer"""
+
+    def __init__(self, writer, output):
+        self.writer = writer
+        self.output = output
+
+    def __enter__(self):
+        self.writer.__enter__()
+        return self
+
+    def write(self, frame):
+        self.writer.write(self.output.resize(frame))
+
+    def __exit__(self, exc_type, exc, tb):
+        return self.writer.__exit__(exc_type, exc, tb)
+
+
+class FanOutWriter:
+    """Write one rendered frame stream to several outputs
+
+    With a queue depth, every output resizes and encodes on its own thread,
+    so the outputs are encoded in parallel while the next frames render.
+    Frames are numbered from `start` to apply the output strides.
+    """
+
+    def __init__(self, outputs, fps, palette_source=None, queue_depth=0, paths=None, start=0):
+        paths = paths if paths is not None else [None] * len(outputs)
+        self.outputs = outputs
+        self.writers = [pipelined(output.open(fps, palette_source, path, start), queue_depth)
+                        for output, path in zip(outputs, paths)]
+        self.index = start
+        self.opened = []
+
+    def __enter__(self):
+        for writer in self.writers:
+            writer.__enter__()
+            self.opened.append(writer)
+        return self
+
+    def write(self, frame):
+        for output, writer in zip(self.outputs, self.writers):
+            if self.index % output.stride == 0:
+                writer.write(frame)
+        self.index += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        # Every opened writer is closed, the first error is raised afterwards
+        error = None
+        for writer in reversed(self.opened):
+            try:
+                writer.__exit__(exc_type, exc, tb)
+            except Exception as e:
+                error = e
+
+        if error is not None and exc_type is None:
+            raise error